@@ -3,20 +3,46 @@ from __future__ import annotations
 import json
 import os
 import re
+import select
+import shlex
+import signal
 import subprocess
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 
 import docker
 from docker.errors import DockerException, NotFound
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 PLAYER_STATUS_RE = re.compile(r"There are (?P<online>\d+) of a max of (?P<max>\d+) players online")
+_STATUS_MARKER = b"There are "
 _STDOUT_TAIL_LIMIT = 8_192
 _DEFAULT_RESTART_TIMEOUT_SEC = 120
-_POLL_INTERVAL_SEC = 2
+_CONTAINER_CACHE_TTL_SEC = 2.0
+_STATUS_LOG_TAIL = 250
+_LOG_TAIL_RETRY_SEC = 5
+_CONTAINER_NAME = "cobblemon"
+
+T = TypeVar("T")
+
+_docker_lock = threading.Lock()
+_docker_client: Optional[docker.DockerClient] = None
+_container_cache: dict[str, tuple[float, object]] = {}
+
+_shell_lock = threading.Lock()
+_shells: dict[Path, "_PersistentShell"] = {}
+
+_whitelist_lock = threading.Lock()
+_whitelist_cache: Optional[tuple[tuple[Path, int, int], list[str]]] = None
 
 
 class ActionError(RuntimeError):
@@ -33,7 +59,7 @@ class AppSettings:
 
     @classmethod
     def from_env(cls) -> "AppSettings":
-        repo_root = Path(os.environ.get("MC_ADMIN_WEB_REPO_ROOT", "/workspace")).resolve()
+        repo_root = _resolve_repo_root(os.environ.get("MC_ADMIN_WEB_REPO_ROOT", "/workspace"))
         password = os.environ.get("MC_ADMIN_WEB_PASSWORD", "")
         session_secret = os.environ.get("MC_ADMIN_WEB_SESSION_SECRET", "")
         cookie_secure = os.environ.get("MC_ADMIN_WEB_COOKIE_SECURE", "false").lower() == "true"
@@ -47,29 +73,75 @@ class AppSettings:
         )
 
 
+@lru_cache(maxsize=8)
+def _resolve_repo_root(raw: str) -> Path:
+    # Keyed on the raw env value, so a changed MC_ADMIN_WEB_REPO_ROOT is still honoured.
+    return Path(raw).resolve()
+
+
 def utcnow_iso() -> str:
     return datetime.now(tz=timezone.utc).isoformat()
 
 
 def get_docker_client() -> docker.DockerClient:
-    try:
-        return docker.from_env()
-    except DockerException as exc:
-        raise ActionError(f"Docker client unavailable: {exc}") from exc
+    """Return a process-wide client so its connection pool is reused across requests."""
+    global _docker_client
+    with _docker_lock:
+        if _docker_client is None:
+            try:
+                _docker_client = docker.from_env()
+            except DockerException as exc:
+                raise ActionError(f"Docker client unavailable: {exc}") from exc
+        return _docker_client
+
+
+def _forget_container(name: str) -> None:
+    with _docker_lock:
+        _container_cache.pop(name, None)
+
 
+def get_container(client: docker.DockerClient, name: str = _CONTAINER_NAME, *, fresh: bool = False):
+    """Return the container handle; ``fresh`` asks for attrs inspected within the cache TTL.
+
+    Callers that only need the id (logs, start/stop) reuse any cached handle.
+    """
+    now = time.monotonic()
+    with _docker_lock:
+        cached = _container_cache.get(name)
+    if cached and (not fresh or now - cached[0] < _CONTAINER_CACHE_TTL_SEC):
+        return cached[1]
 
-def get_container(client: docker.DockerClient, name: str = "cobblemon"):
     try:
+        # containers.get() already inspects the container, so attrs are current.
         container = client.containers.get(name)
-        container.reload()
-        return container
     except NotFound as exc:
+        _forget_container(name)
         raise ActionError(
             "Container 'cobblemon' is missing. Start the stack from the server CLI with ./infra/start.sh."
         ) from exc
     except DockerException as exc:
+        _forget_container(name)
         raise ActionError(f"Failed to inspect Docker container: {exc}") from exc
 
+    with _docker_lock:
+        _container_cache[name] = (time.monotonic(), container)
+    return container
+
+
+def _call_container(client: docker.DockerClient, call: Callable[[Any], T]) -> tuple[Any, T]:
+    """Run ``call`` on the cached container handle and return ``(container, result)``.
+
+    A handle cached before the container was recreated (new id) raises NotFound;
+    re-resolve it by name once and retry instead of failing the action.
+    """
+    container = get_container(client)
+    try:
+        return container, call(container)
+    except NotFound:
+        _forget_container(_CONTAINER_NAME)
+    container = get_container(client, fresh=True)
+    return container, call(container)
+
 
 def _safe_decode(data: object) -> str:
     if isinstance(data, bytes):
@@ -77,10 +149,10 @@ def _safe_decode(data: object) -> str:
     return str(data)
 
 
-def _truncate(text: str) -> str:
-    if len(text) <= _STDOUT_TAIL_LIMIT:
-        return text
-    return text[-_STDOUT_TAIL_LIMIT:]
+def _truncate(data: bytes) -> bytes:
+    if len(data) <= _STDOUT_TAIL_LIMIT:
+        return data
+    return data[-_STDOUT_TAIL_LIMIT:]
 
 
 def _run_script(repo_root: Path, *args: str, timeout: int) -> tuple[str, str]:
@@ -90,7 +162,6 @@ def _run_script(repo_root: Path, *args: str, timeout: int) -> tuple[str, str]:
             command,
             cwd=repo_root,
             capture_output=True,
-            text=True,
             timeout=timeout,
             check=False,
         )
@@ -99,44 +170,262 @@ def _run_script(repo_root: Path, *args: str, timeout: int) -> tuple[str, str]:
     except subprocess.TimeoutExpired as exc:
         raise ActionError(f"Command timed out after {timeout}s: {' '.join(command)}") from exc
 
-    stdout = _truncate(proc.stdout)
-    stderr = _truncate(proc.stderr)
+    # Cut the raw output to the tail before decoding; backups can print a lot.
+    stdout = _safe_decode(_truncate(proc.stdout))
+    stderr = _safe_decode(_truncate(proc.stderr))
     if proc.returncode != 0:
         message = stderr or stdout or f"Command failed with exit code {proc.returncode}"
         raise ActionError(message)
     return stdout, stderr
 
 
+class _ShellUnavailable(RuntimeError):
+    """The shell could not be started or sent the command; nothing has run."""
+
+
+class _PersistentShell:
+    """A long-lived bash that runs each command in a subshell and frames its exit code.
+
+    Output of a command is followed by ``\\0<exit code>\\0`` on stdout, which lets
+    quick player.sh calls skip starting a fresh interpreter from Python.
+    """
+
+    def __init__(self, cwd: Path) -> None:
+        self._cwd = cwd
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def run(self, args: list[str], timeout: int) -> tuple[int, bytes]:
+        with self._lock:
+            proc = self._ensure_started()
+            line = f"( {shlex.join(args)} ) </dev/null 2>&1; printf '\\0%d\\0' \"$?\"\n"
+            try:
+                proc.stdin.write(line.encode("utf-8"))
+                proc.stdin.flush()
+            except OSError as exc:
+                self._kill()
+                raise _ShellUnavailable(str(exc)) from exc
+            return self._read_frame(proc, timeout, " ".join(args))
+
+    def close(self) -> None:
+        with self._lock:
+            self._kill()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            try:
+                self._proc = subprocess.Popen(
+                    ["bash", "--noprofile", "--norc"],
+                    cwd=self._cwd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            except OSError as exc:
+                raise _ShellUnavailable(str(exc)) from exc
+        return self._proc
+
+    def _read_frame(self, proc: subprocess.Popen, timeout: int, label: str) -> tuple[int, bytes]:
+        fd = proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        buffer = bytearray()
+        while True:
+            if buffer.endswith(b"\0"):
+                start = buffer.rfind(b"\0", 0, len(buffer) - 1)
+                if start != -1 and buffer[start + 1 : -1].isdigit():
+                    return int(buffer[start + 1 : -1]), bytes(buffer[:start])
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._kill()
+                raise ActionError(f"Command timed out after {timeout}s: {label}")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65_536)
+            if not chunk:
+                # The command line was already sent and may have run, so this is
+                # not a reason to fall back and run it a second time.
+                self._kill()
+                raise ActionError(f"Shell exited before the command finished: {label}")
+            buffer += chunk
+
+    def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+
+
+def _run_quick_script(repo_root: Path, *args: str, timeout: int) -> tuple[str, str]:
+    with _shell_lock:
+        shell = _shells.get(repo_root)
+        if shell is None:
+            shell = _shells[repo_root] = _PersistentShell(repo_root)
+
+    try:
+        returncode, output = shell.run(["bash", *args], timeout)
+    except _ShellUnavailable:
+        return _run_script(repo_root, *args, timeout=timeout)
+
+    # The subshell merges stderr into stdout.
+    text = _safe_decode(_truncate(output))
+    if returncode != 0:
+        raise ActionError(text or f"Command failed with exit code {returncode}")
+    return text, ""
+
+
+def close_shells() -> None:
+    with _shell_lock:
+        shells = list(_shells.values())
+        _shells.clear()
+    for shell in shells:
+        shell.close()
+
+
+def _run_batch_script(repo_root: Path, commands: list[list[str]], timeout: int) -> tuple[str, str]:
+    script = "set -euo pipefail\n" + "\n".join(shlex.join(command) for command in commands)
+    return _run_script(repo_root, "-c", script, timeout=timeout)
+
+
 def read_whitelist(repo_root: Path) -> list[str]:
+    global _whitelist_cache
     path = repo_root / "data" / "whitelist.json"
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return []
 
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _whitelist_lock:
+        if _whitelist_cache is not None and _whitelist_cache[0] == key:
+            return list(_whitelist_cache[1])
+
+    # Whitelists are small; one native parse of the raw bytes beats streaming tokens.
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
+        data = _json_loads(path.read_bytes())
+    except ValueError as exc:
         raise ActionError(f"Failed to parse whitelist file: {exc}") from exc
-
     names = [str(entry["name"]) for entry in data if isinstance(entry, dict) and "name" in entry]
     names.sort(key=str.casefold)
-    return names
+    with _whitelist_lock:
+        _whitelist_cache = (key, names)
+    return list(names)
 
 
 def read_logs(tail: int) -> list[str]:
     client = get_docker_client()
-    container = get_container(client)
     try:
-        content = _safe_decode(container.logs(tail=tail))
+        _, raw = _call_container(client, lambda container: container.logs(tail=tail))
     except DockerException as exc:
+        _forget_container(_CONTAINER_NAME)
         raise ActionError(f"Failed to read container logs: {exc}") from exc
 
-    return [line for line in content.splitlines() if line.strip()]
+    return [_safe_decode(line) for line in raw.splitlines() if line and not line.isspace()]
 
 
-def get_status(repo_root: Path) -> dict[str, object]:
+def _scan_status_line(container) -> Optional[str]:
+    try:
+        raw = container.logs(tail=_STATUS_LOG_TAIL)
+    except DockerException as exc:
+        raise ActionError(f"Failed to read container logs: {exc}") from exc
+
+    # One backwards scan over the raw bytes, then decode only the matching line.
+    idx = raw.rfind(_STATUS_MARKER)
+    if idx == -1:
+        return None
+    start = raw.rfind(b"\n", 0, idx) + 1
+    end = raw.find(b"\n", idx)
+    return _safe_decode(raw[start:end if end != -1 else len(raw)].rstrip(b"\r"))
+
+
+def _parse_player_counts(line: Optional[str]) -> tuple[Optional[int], Optional[int]]:
+    match = PLAYER_STATUS_RE.search(line) if line else None
+    if not match:
+        return None, None
+    return int(match.group("online")), int(match.group("max"))
+
+
+class StatusLogTail:
+    """Follows the container log in the background and keeps the last player-count line."""
+
+    def __init__(self, container_name: str = _CONTAINER_NAME) -> None:
+        self._container_name = container_name
+        self._lock = threading.Lock()
+        self._last_status_line: Optional[str] = None
+        self._players: tuple[Optional[int], Optional[int]] = (None, None)
+        self._stop = threading.Event()
+        self._stream = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def live(self) -> bool:
+        """True while the log stream is attached, i.e. the snapshot is being kept current."""
+        return self._stream is not None
+
+    @property
+    def last_status_line(self) -> Optional[str]:
+        with self._lock:
+            return self._last_status_line
+
+    def snapshot(self) -> tuple[Optional[str], Optional[int], Optional[int]]:
+        with self._lock:
+            return (self._last_status_line, *self._players)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._follow_loop, name="mc-admin-log-tail", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def feed(self, line: str) -> None:
+        # The regex runs once per new status line here, never on the request path.
+        if "There are " in line:
+            players = _parse_player_counts(line)
+            with self._lock:
+                self._last_status_line = line
+                self._players = players
+
+    def _follow_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                container = get_container(get_docker_client(), self._container_name)
+                self._stream = container.logs(stream=True, follow=True, tail=_STATUS_LOG_TAIL)
+                pending = b""
+                for chunk in self._stream:
+                    pending += chunk
+                    *lines, pending = pending.split(b"\n")
+                    for line in lines:
+                        if _STATUS_MARKER in line:
+                            self.feed(_safe_decode(line))
+            except Exception:  # noqa: BLE001
+                pass
+            finally:
+                # The stream ends when the container stops or is recreated; look it up again.
+                self._stream = None
+                _forget_container(self._container_name)
+            self._stop.wait(_LOG_TAIL_RETRY_SEC)
+
+
+def get_status(repo_root: Path, status_tail: Optional[StatusLogTail] = None) -> dict[str, object]:
     client = get_docker_client()
     try:
-        container = get_container(client)
+        container = get_container(client, fresh=True)
     except ActionError as exc:
         if "missing" not in str(exc):
             raise
@@ -154,19 +443,14 @@ def get_status(repo_root: Path) -> dict[str, object]:
     state = str(container.attrs.get("State", {}).get("Status", "unknown"))
     health = str(container.attrs.get("State", {}).get("Health", {}).get("Status", "none"))
 
-    try:
-        lines = [line for line in _safe_decode(container.logs(tail=250)).splitlines() if line.strip()]
-    except DockerException as exc:
-        raise ActionError(f"Failed to read container logs: {exc}") from exc
-
-    last_status_line = next((line for line in reversed(lines) if "There are " in line), None)
-    players_online: Optional[int] = None
-    players_max: Optional[int] = None
-    if last_status_line:
-        match = PLAYER_STATUS_RE.search(last_status_line)
-        if match:
-            players_online = int(match.group("online"))
-            players_max = int(match.group("max"))
+    last_status_line = None
+    if status_tail is not None and status_tail.live:
+        last_status_line, players_online, players_max = status_tail.snapshot()
+    if last_status_line is None:
+        # The tail has not connected yet, is reconnecting after a Docker error,
+        # or has not seen a status line: read it from the log as before.
+        last_status_line = _scan_status_line(container)
+        players_online, players_max = _parse_player_counts(last_status_line)
 
     return {
         "container_exists": True,
@@ -182,46 +466,79 @@ def get_status(repo_root: Path) -> dict[str, object]:
 
 def start_container() -> tuple[str, str]:
     client = get_docker_client()
-    container = get_container(client)
     try:
-        container.start()
-        container.reload()
+        _call_container(client, lambda container: container.start())
     except DockerException as exc:
         raise ActionError(f"Failed to start container: {exc}") from exc
-    return (f"Container state: {container.status}", "")
+    finally:
+        _forget_container(_CONTAINER_NAME)
+    # A successful start call means the container is running; no need to inspect again.
+    return ("Container state: running", "")
 
 
 def stop_container() -> tuple[str, str]:
     client = get_docker_client()
-    container = get_container(client)
     try:
-        container.stop(timeout=30)
-        container.reload()
+        _call_container(client, lambda container: container.stop(timeout=30))
     except DockerException as exc:
         raise ActionError(f"Failed to stop container: {exc}") from exc
-    return (f"Container state: {container.status}", "")
+    finally:
+        _forget_container(_CONTAINER_NAME)
+    return ("Container state: exited", "")
+
+
+def _container_health(container) -> tuple[Optional[str], str]:
+    try:
+        container.reload()
+    except DockerException as exc:
+        raise ActionError(f"Failed to refresh container state: {exc}") from exc
+    state = container.attrs.get("State", {}).get("Status")
+    health = container.attrs.get("State", {}).get("Health", {}).get("Status", "none")
+    return state, health
 
 
 def restart_container(timeout_sec: int = _DEFAULT_RESTART_TIMEOUT_SEC) -> tuple[str, str]:
     client = get_docker_client()
-    container = get_container(client)
+    since = int(time.time())
     try:
-        container.restart(timeout=30)
+        container, _ = _call_container(client, lambda container: container.restart(timeout=30))
     except DockerException as exc:
         raise ActionError(f"Failed to restart container: {exc}") from exc
 
-    deadline = time.monotonic() + timeout_sec
-    while time.monotonic() < deadline:
-        try:
-            container.reload()
-        except DockerException as exc:
-            raise ActionError(f"Failed to refresh container state: {exc}") from exc
+    state, health = _container_health(container)
+    if state == "running" and health in {"healthy", "none"}:
+        return (f"Container state: {state}, health: {health}", "")
 
-        state = container.attrs.get("State", {}).get("Status")
-        health = container.attrs.get("State", {}).get("Health", {}).get("Status", "none")
-        if state == "running" and health in {"healthy", "none"}:
-            return (f"Container state: {state}, health: {health}", "")
-        time.sleep(_POLL_INTERVAL_SEC)
+    # Wait for the daemon to push the health transition instead of polling inspect.
+    # Events are replayed from just before the restart, so ignore anything until
+    # the container has started again.
+    try:
+        events = client.events(
+            since=since,
+            until=int(time.time()) + timeout_sec,
+            filters={"container": container.id, "event": ["start", "die", "health_status"]},
+            decode=True,
+        )
+    except DockerException as exc:
+        raise ActionError(f"Failed to watch container events: {exc}") from exc
+
+    started = False
+    try:
+        for event in events:
+            action = str(event.get("Action") or event.get("status") or "")
+            if action == "start":
+                started = True
+                state, health = _container_health(container)
+                if state == "running" and health in {"healthy", "none"}:
+                    return (f"Container state: {state}, health: {health}", "")
+            elif started and action == "die":
+                raise ActionError("Container exited while waiting for it to become healthy")
+            elif started and action == "health_status: healthy":
+                return ("Container state: running, health: healthy", "")
+    except DockerException as exc:
+        raise ActionError(f"Failed to watch container events: {exc}") from exc
+    finally:
+        events.close()
 
     raise ActionError("Container did not become healthy within the restart timeout")
 
@@ -234,19 +551,29 @@ def add_player(repo_root: Path, name: str, op: bool) -> tuple[str, str]:
     args = ["infra/player.sh", "add", name]
     if op:
         args.append("--op")
-    return _run_script(repo_root, *args, timeout=60)
+    return _run_quick_script(repo_root, *args, timeout=60)
 
 
 def remove_player(repo_root: Path, name: str) -> tuple[str, str]:
-    return _run_script(repo_root, "infra/player.sh", "remove", name, timeout=60)
+    return _run_quick_script(repo_root, "infra/player.sh", "remove", name, timeout=60)
 
 
 def op_player(repo_root: Path, name: str) -> tuple[str, str]:
-    return _run_script(repo_root, "infra/player.sh", "op", name, timeout=60)
+    return _run_quick_script(repo_root, "infra/player.sh", "op", name, timeout=60)
 
 
 def deop_player(repo_root: Path, name: str) -> tuple[str, str]:
-    return _run_script(repo_root, "infra/player.sh", "deop", name, timeout=60)
+    return _run_quick_script(repo_root, "infra/player.sh", "deop", name, timeout=60)
+
+
+def run_player_batch(repo_root: Path, operations: list[tuple[str, str, bool]]) -> tuple[str, str]:
+    commands = []
+    for action, name, op in operations:
+        command = ["bash", "infra/player.sh", action, name]
+        if action == "add" and op:
+            command.append("--op")
+        commands.append(command)
+    return _run_batch_script(repo_root, commands, timeout=60 * len(commands))
 
 
 def run_onboard(repo_root: Path, name: str, op: bool) -> tuple[str, str]:
@@ -34,8 +34,9 @@ def get_csrf_token(request: Request) -> str:
 
 
 def verify_password(provided: str, configured: str) -> bool:
-    provided_digest = hashlib.sha256(provided.encode("utf-8")).hexdigest()
-    configured_digest = hashlib.sha256(configured.encode("utf-8")).hexdigest()
+    # Compare fixed-size raw digests so the check does not leak the configured length.
+    provided_digest = hashlib.sha256(provided.encode("utf-8")).digest()
+    configured_digest = hashlib.sha256(configured.encode("utf-8")).digest()
     return secrets.compare_digest(provided_digest, configured_digest)
 
 
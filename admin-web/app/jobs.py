@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import queue
 import threading
 import uuid
-from collections import OrderedDict
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Callable, Optional
 
 OutputTuple = tuple[str, str]
 JobCallable = Callable[[], OutputTuple]
+JobSnapshot = dict[str, str | int | None]
+TERMINAL_STATUSES = frozenset({"succeeded", "failed"})
 
 
 @dataclass
@@ -23,7 +27,7 @@ class JobRecord:
     stdout_tail: str = ""
     stderr_tail: str = ""
 
-    def to_dict(self) -> dict[str, str | int | None]:
+    def to_dict(self) -> JobSnapshot:
         return {
             "id": self.id,
             "action": self.action,
@@ -44,10 +48,14 @@ class _QueuedJob:
 
 class JobQueue:
     def __init__(self, history_limit: int = 100) -> None:
-        self._history_limit = history_limit
-        self._queue: "queue.Queue[Optional[_QueuedJob]]" = queue.Queue()
-        self._records: OrderedDict[str, JobRecord] = OrderedDict()
+        self._queue: "queue.SimpleQueue[Optional[_QueuedJob]]" = queue.SimpleQueue()
+        # Keep at least the newest job: with maxlen=0 nothing would ever be
+        # evicted from _records.
+        self._order: deque[JobRecord] = deque(maxlen=max(1, history_limit))
+        self._records: dict[str, JobRecord] = {}
         self._lock = threading.Lock()
+        # Per-job asyncio events of stream clients, set from the worker thread.
+        self._watchers: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
         self._thread = threading.Thread(target=self._worker_loop, name="mc-admin-worker", daemon=True)
         self._started = False
 
@@ -67,27 +75,56 @@ class JobQueue:
     def enqueue(self, action: str, fn: JobCallable) -> JobRecord:
         record = JobRecord(id=str(uuid.uuid4()), action=action)
         with self._lock:
+            if len(self._order) == self._order.maxlen:
+                evicted = self._order[0]
+                self._records.pop(evicted.id, None)
+                self._wake_watchers(evicted.id)
+            self._order.append(record)
             self._records[record.id] = record
-            self._records.move_to_end(record.id)
-            while len(self._records) > self._history_limit:
-                self._records.popitem(last=False)
         self._queue.put(_QueuedJob(record=record, fn=fn))
         return record
 
-    def list(self) -> list[JobRecord]:
+    def list(self) -> list[JobSnapshot]:
         with self._lock:
-            return list(reversed([self._copy(record) for record in self._records.values()]))
+            return [record.to_dict() for record in reversed(self._order)]
 
-    def get(self, job_id: str) -> Optional[JobRecord]:
+    def get(self, job_id: str) -> Optional[JobSnapshot]:
         with self._lock:
             record = self._records.get(job_id)
-            return self._copy(record) if record else None
+            return record.to_dict() if record else None
+
+    async def watch(self, job_id: str, last_status: str, timeout: float) -> Optional[JobSnapshot]:
+        """Wait until the job leaves ``last_status`` or ``timeout`` elapses; return its snapshot."""
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        watcher = (loop, event)
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is None or record.status != last_status:
+                return record.to_dict() if record else None
+            self._watchers.setdefault(job_id, []).append(watcher)
+        try:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(event.wait(), timeout)
+        finally:
+            with self._lock:
+                watchers = self._watchers.get(job_id)
+                if watchers is not None:
+                    watchers.remove(watcher)
+                    if not watchers:
+                        del self._watchers[job_id]
+        return self.get(job_id)
+
+    def _wake_watchers(self, job_id: str) -> None:
+        # Called with the lock held.
+        for loop, event in self._watchers.get(job_id, ()):
+            with contextlib.suppress(RuntimeError):  # loop already closed
+                loop.call_soon_threadsafe(event.set)
 
     def _worker_loop(self) -> None:
         while True:
             item = self._queue.get()
             if item is None:
-                self._queue.task_done()
                 return
 
             self._mark_running(item.record.id)
@@ -97,14 +134,13 @@ class JobQueue:
                 self._mark_finished(item.record.id, succeeded=False, exit_code=1, stdout="", stderr=str(exc))
             else:
                 self._mark_finished(item.record.id, succeeded=True, exit_code=0, stdout=stdout, stderr=stderr)
-            finally:
-                self._queue.task_done()
 
     def _mark_running(self, job_id: str) -> None:
         with self._lock:
             record = self._records[job_id]
             record.status = "running"
             record.started_at = self._utcnow()
+            self._wake_watchers(job_id)
 
     def _mark_finished(self, job_id: str, *, succeeded: bool, exit_code: int, stdout: str, stderr: str) -> None:
         with self._lock:
@@ -114,20 +150,8 @@ class JobQueue:
             record.stdout_tail = stdout[-8192:]
             record.stderr_tail = stderr[-8192:]
             record.finished_at = self._utcnow()
+            self._wake_watchers(job_id)
 
     @staticmethod
     def _utcnow() -> str:
         return datetime.now(tz=timezone.utc).isoformat()
-
-    @staticmethod
-    def _copy(record: JobRecord) -> JobRecord:
-        return JobRecord(
-            id=record.id,
-            action=record.action,
-            status=record.status,
-            started_at=record.started_at,
-            finished_at=record.finished_at,
-            exit_code=record.exit_code,
-            stdout_tail=record.stdout_tail,
-            stderr_tail=record.stderr_tail,
-        )
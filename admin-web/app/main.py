@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import Depends, FastAPI, Form, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
@@ -13,7 +15,9 @@ from . import auth
 from .actions import (
     ActionError,
     AppSettings,
+    StatusLogTail,
     add_player,
+    close_shells,
     op_player,
     deop_player,
     get_status,
@@ -23,19 +27,32 @@ from .actions import (
     restart_container,
     run_backup,
     run_onboard,
+    run_player_batch,
     start_container,
     stop_container,
 )
-from .jobs import JobQueue
-from .models import JobListResponse, JobResponse, LogResponse, OnboardRequest, PlayerActionRequest, PlayerAddRequest, StatusResponse, WhitelistResponse
+from .jobs import TERMINAL_STATUSES, JobQueue
+from .models import (
+    JobListResponse,
+    JobResponse,
+    LogResponse,
+    OnboardRequest,
+    PlayerActionRequest,
+    PlayerAddRequest,
+    PlayerBatchRequest,
+    StatusResponse,
+    WhitelistResponse,
+)
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+SETTINGS = AppSettings.from_env()
+JOB_STREAM_KEEPALIVE_SEC = 15.0
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    settings = AppSettings.from_env()
+    settings = SETTINGS
     if not settings.password:
         raise RuntimeError("MC_ADMIN_WEB_PASSWORD must be configured")
     if not settings.session_secret:
@@ -44,18 +61,22 @@ async def lifespan(app: FastAPI):
     app.state.settings = settings
     app.state.jobs = JobQueue(history_limit=settings.job_history)
     app.state.jobs.start()
+    app.state.status_tail = StatusLogTail()
+    app.state.status_tail.start()
     try:
         yield
     finally:
+        app.state.status_tail.stop()
         app.state.jobs.stop()
+        close_shells()
 
 
 app = FastAPI(title="Minecraft Admin Web", lifespan=lifespan)
 app.add_middleware(
     SessionMiddleware,
-    secret_key=AppSettings.from_env().session_secret or "dev-session-secret",
+    secret_key=SETTINGS.session_secret or "dev-session-secret",
     same_site="strict",
-    https_only=AppSettings.from_env().cookie_secure,
+    https_only=SETTINGS.cookie_secure,
     session_cookie="mc_admin_session",
 )
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
@@ -136,7 +157,7 @@ async def api_status(
     _: None = Depends(require_api_login),
     settings: AppSettings = Depends(get_settings),
 ):
-    return get_status(settings.repo_root)
+    return get_status(settings.repo_root, status_tail=request.app.state.status_tail)
 
 
 @app.get("/api/logs", response_model=LogResponse)
@@ -205,6 +226,19 @@ async def api_player_deop(
     return enqueue_job(jobs, "player.deop", lambda: deop_player(settings.repo_root, payload.name))
 
 
+@app.post("/api/players/batch", response_model=JobResponse)
+async def api_player_batch(
+    payload: PlayerBatchRequest,
+    request: Request,
+    _: None = Depends(require_api_login),
+    settings: AppSettings = Depends(get_settings),
+    jobs: JobQueue = Depends(get_jobs),
+):
+    auth.verify_csrf(request)
+    operations = [(item.action, item.name, item.op) for item in payload.operations]
+    return enqueue_job(jobs, "player.batch", lambda: run_player_batch(settings.repo_root, operations))
+
+
 @app.post("/api/onboard", response_model=JobResponse)
 async def api_onboard(
     payload: OnboardRequest,
@@ -264,7 +298,7 @@ async def api_jobs(
     _: None = Depends(require_api_login),
     jobs: JobQueue = Depends(get_jobs),
 ):
-    return JobListResponse(jobs=[record.to_dict() for record in jobs.list()])
+    return JobListResponse(jobs=jobs.list())
 
 
 @app.get("/api/jobs/{job_id}")
@@ -274,7 +308,45 @@ async def api_job_details(
     _: None = Depends(require_api_login),
     jobs: JobQueue = Depends(get_jobs),
 ):
-    record = jobs.get(job_id)
-    if not record:
+    job = jobs.get(job_id)
+    if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-    return record.to_dict()
+    return job
+
+
+@app.get("/api/jobs/{job_id}/stream")
+async def api_job_stream(
+    job_id: str,
+    request: Request,
+    timeout: float | None = Query(default=None, gt=0),
+    _: None = Depends(require_api_login),
+    jobs: JobQueue = Depends(get_jobs),
+):
+    """Server-sent job snapshots until the job finishes, or for at most ``timeout`` seconds."""
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    async def frames():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        snapshot = job
+        yield f"data: {json.dumps(snapshot)}\n\n"
+        while snapshot["status"] not in TERMINAL_STATUSES:
+            if await request.is_disconnected():
+                return
+            wait = JOB_STREAM_KEEPALIVE_SEC
+            if deadline is not None:
+                wait = min(wait, deadline - loop.time())
+                if wait <= 0:
+                    return
+            last_status = snapshot["status"]
+            snapshot = await jobs.watch(job_id, last_status, wait)
+            if snapshot is None:
+                return
+            if snapshot["status"] == last_status:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(frames(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
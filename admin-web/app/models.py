@@ -1,22 +1,23 @@
 from __future__ import annotations
 
+import re
 from typing import Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
-_PLAYER_ALLOWED = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+_PLAYER_NAME_RE = re.compile(r"[A-Za-z0-9_]{3,16}")
 
 
 class PlayerActionRequest(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
 
-    name: str = Field(min_length=3, max_length=16)
+    name: str
 
     @field_validator("name")
     @classmethod
     def validate_name(cls, value: str) -> str:
-        if any(ch not in _PLAYER_ALLOWED for ch in value):
-            raise ValueError("Player names must contain only letters, digits, or underscores")
+        if not _PLAYER_NAME_RE.fullmatch(value):
+            raise ValueError("Player names must be 3-16 letters, digits, or underscores")
         return value
 
 
@@ -28,6 +29,15 @@ class OnboardRequest(PlayerActionRequest):
     op: bool = False
 
 
+class PlayerBatchOperation(PlayerActionRequest):
+    action: Literal["add", "remove", "op", "deop"]
+    op: bool = False
+
+
+class PlayerBatchRequest(BaseModel):
+    operations: list[PlayerBatchOperation] = Field(min_length=1, max_length=50)
+
+
 class JobResponse(BaseModel):
     job_id: str
     status: Literal["queued", "running", "succeeded", "failed"]
@@ -3,8 +3,10 @@ from __future__ import annotations
 from pathlib import Path
 
 import pytest
+from docker.errors import NotFound
 
-from app.actions import ActionError, _run_script, read_whitelist
+from app import actions
+from app.actions import ActionError, StatusLogTail, _run_script, get_container, read_whitelist
 
 
 def test_read_whitelist_sorts_names(tmp_path: Path):
@@ -15,6 +17,17 @@ def test_read_whitelist_sorts_names(tmp_path: Path):
     assert read_whitelist(tmp_path) == ["Ash", "misty"]
 
 
+def test_read_whitelist_reparses_after_file_change(tmp_path: Path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    path = data_dir / "whitelist.json"
+    path.write_text('[{"name":"Ash"}]', encoding="utf-8")
+    assert read_whitelist(tmp_path) == ["Ash"]
+
+    path.write_text('[{"name":"Ash"},{"name":"Brock"}]', encoding="utf-8")
+    assert read_whitelist(tmp_path) == ["Ash", "Brock"]
+
+
 def test_read_whitelist_invalid_json_raises(tmp_path: Path):
     data_dir = tmp_path / "data"
     data_dir.mkdir()
@@ -38,3 +51,177 @@ def test_run_script_surfaces_non_zero_exit(tmp_path: Path, monkeypatch: pytest.M
     )
     with pytest.raises(ActionError, match="boom"):
         _run_script(tmp_path, "fail.sh", timeout=5)
+
+
+class _FakeContainer:
+    def __init__(self) -> None:
+        self.reloads = 0
+
+    def reload(self) -> None:
+        self.reloads += 1
+
+
+class _FakeContainers:
+    def __init__(self) -> None:
+        self.lookups = 0
+
+    def get(self, name: str) -> _FakeContainer:
+        self.lookups += 1
+        return _FakeContainer()
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.containers = _FakeContainers()
+
+
+def test_get_container_reuses_handle_within_ttl(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(actions, "_container_cache", {})
+    client = _FakeClient()
+
+    first = get_container(client)
+    second = get_container(client)
+
+    assert first is second
+    assert client.containers.lookups == 1
+
+
+class _FakeRecreatedContainers:
+    def __init__(self, handles: list) -> None:
+        self.handles = handles
+        self.lookups = 0
+
+    def get(self, name: str):
+        self.lookups += 1
+        return self.handles.pop(0)
+
+
+class _FakeLogsContainer:
+    def __init__(self, raw: bytes | None) -> None:
+        self.raw = raw
+
+    def logs(self, tail: int) -> bytes:
+        if self.raw is None:
+            raise NotFound("no such container")
+        return self.raw
+
+
+def test_read_logs_re_resolves_recreated_container(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(actions, "_container_cache", {})
+    client = _FakeClient()
+    client.containers = _FakeRecreatedContainers([_FakeLogsContainer(None), _FakeLogsContainer(b"[INFO]: Done\n")])
+    monkeypatch.setattr(actions, "get_docker_client", lambda: client)
+
+    assert actions.read_logs(tail=10) == ["[INFO]: Done"]
+    assert client.containers.lookups == 2
+
+
+def test_status_log_tail_keeps_latest_player_count_line():
+    tail = StatusLogTail()
+    tail.feed("[Server thread/INFO]: There are 1 of a max of 20 players online: Ash")
+    tail.feed("[Server thread/INFO]: Ash left the game")
+    tail.feed("[Server thread/INFO]: There are 0 of a max of 20 players online:")
+
+    assert tail.last_status_line == "[Server thread/INFO]: There are 0 of a max of 20 players online:"
+    assert tail.snapshot() == ("[Server thread/INFO]: There are 0 of a max of 20 players online:", 0, 20)
+
+
+class _FakeLogContainer:
+    def __init__(self, raw: bytes) -> None:
+        self.raw = raw
+
+    def logs(self, tail: int) -> bytes:
+        return self.raw
+
+
+def test_scan_status_line_returns_last_matching_line():
+    raw = (
+        b"[INFO]: There are 1 of a max of 20 players online: Ash\n"
+        b"[INFO]: There are 2 of a max of 20 players online: Ash, Misty\r\n"
+        b"[INFO]: Saving chunks\n"
+    )
+    assert actions._scan_status_line(_FakeLogContainer(raw)) == "[INFO]: There are 2 of a max of 20 players online: Ash, Misty"
+    assert actions._scan_status_line(_FakeLogContainer(b"[INFO]: Done\n")) is None
+
+
+class _FakeStatusContainer(_FakeLogContainer):
+    attrs = {"State": {"Status": "running", "Health": {"Status": "healthy"}}}
+
+
+def test_get_status_scans_logs_until_tail_is_live(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "whitelist.json").write_text("[]", encoding="utf-8")
+    container = _FakeStatusContainer(b"[INFO]: There are 3 of a max of 20 players online: Ash, Misty, Brock\n")
+    monkeypatch.setattr(actions, "get_docker_client", lambda: object())
+    monkeypatch.setattr(actions, "get_container", lambda client, fresh=False: container)
+
+    tail = StatusLogTail()
+    status = actions.get_status(tmp_path, status_tail=tail)
+    assert (status["players_online"], status["players_max"]) == (3, 20)
+
+    tail.feed("[INFO]: There are 1 of a max of 20 players online: Ash")
+    tail._stream = object()
+    status = actions.get_status(tmp_path, status_tail=tail)
+    assert (status["players_online"], status["players_max"]) == (1, 20)
+
+
+def test_quick_script_reuses_shell_and_surfaces_failures(tmp_path: Path):
+    (tmp_path / "ok.sh").write_text('echo "hello $1"\n', encoding="utf-8")
+    (tmp_path / "fail.sh").write_text('echo "boom" >&2\nexit 4\n', encoding="utf-8")
+    try:
+        assert actions._run_quick_script(tmp_path, "ok.sh", "Ash", timeout=5) == ("hello Ash\n", "")
+        shell = actions._shells[tmp_path]
+        with pytest.raises(ActionError, match="boom"):
+            actions._run_quick_script(tmp_path, "fail.sh", timeout=5)
+        assert actions._run_quick_script(tmp_path, "ok.sh", "Misty", timeout=5) == ("hello Misty\n", "")
+        assert actions._shells[tmp_path] is shell
+    finally:
+        actions.close_shells()
+
+
+def test_quick_script_does_not_rerun_when_shell_dies_mid_command(tmp_path: Path):
+    (tmp_path / "die.sh").write_text('echo ran >> runs.txt\nkill -9 0\n', encoding="utf-8")
+    try:
+        with pytest.raises(ActionError, match="Shell exited"):
+            actions._run_quick_script(tmp_path, "die.sh", timeout=5)
+        assert (tmp_path / "runs.txt").read_text(encoding="utf-8") == "ran\n"
+    finally:
+        actions.close_shells()
+
+
+class _FakeRestartContainer:
+    id = "abc123"
+
+    def __init__(self) -> None:
+        self.attrs = {"State": {"Status": "running", "Health": {"Status": "starting"}}}
+
+    def restart(self, timeout: int) -> None:
+        pass
+
+    def reload(self) -> None:
+        pass
+
+
+class _FakeEvents(list):
+    closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_restart_container_waits_for_health_event(monkeypatch: pytest.MonkeyPatch):
+    container = _FakeRestartContainer()
+    events = _FakeEvents(
+        [
+            {"Action": "health_status: healthy"},
+            {"Action": "die"},
+            {"Action": "start"},
+            {"Action": "health_status: healthy"},
+        ]
+    )
+    client = type("Client", (), {"events": lambda self, **kwargs: events})()
+    monkeypatch.setattr(actions, "get_docker_client", lambda: client)
+    monkeypatch.setattr(actions, "get_container", lambda client: container)
+
+    assert actions.restart_container(timeout_sec=5) == ("Container state: running, health: healthy", "")
+    assert events.closed
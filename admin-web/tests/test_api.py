@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import json
 import time
 
+TERMINAL = {"succeeded", "failed"}
+
 
 def wait_for_job(client, job_id: str, timeout: float = 2.0) -> dict:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        response = client.get(f"/api/jobs/{job_id}")
-        payload = response.json()
-        if payload["status"] in {"succeeded", "failed"}:
+    deadline = time.monotonic() + timeout
+    # The server closes the stream after ``timeout`` even if the job is stuck.
+    stream = client.stream("GET", f"/api/jobs/{job_id}/stream", params={"timeout": timeout}, timeout=timeout + 5)
+    with stream as response:
+        if response.status_code == 200:
+            for line in response.iter_lines():
+                if line.startswith("data: "):
+                    payload = json.loads(line[len("data: ") :])
+                    if payload["status"] in TERMINAL:
+                        return payload
+                if time.monotonic() >= deadline:
+                    raise AssertionError(f"Job {job_id} did not finish in time")
+
+    # Stream unavailable or closed early: poll for whatever time is left.
+    while time.monotonic() < deadline:
+        payload = client.get(f"/api/jobs/{job_id}").json()
+        if payload["status"] in TERMINAL:
             return payload
         time.sleep(0.05)
     raise AssertionError(f"Job {job_id} did not finish in time")
@@ -21,7 +36,7 @@ def test_status_endpoint_returns_payload(client, app_module, monkeypatch):
     monkeypatch.setattr(
         app_module,
         "get_status",
-        lambda repo_root: {
+        lambda repo_root, status_tail=None: {
             "container_exists": True,
             "container_state": "running",
             "health": "healthy",
@@ -59,12 +74,42 @@ def test_player_add_enqueues_job(client, app_module, monkeypatch, csrf_token):
     assert seen["args"][1:] == ("Brock", True)
 
 
+def test_player_batch_enqueues_single_job(client, app_module, monkeypatch, csrf_token):
+    seen = {}
+
+    def fake_batch(repo_root, operations):
+        seen["operations"] = operations
+        return ("batch ok", "")
+
+    monkeypatch.setattr(app_module, "run_player_batch", fake_batch)
+
+    response = client.post(
+        "/api/players/batch",
+        headers={"X-CSRF-Token": csrf_token},
+        json={"operations": [{"action": "add", "name": "Brock", "op": True}, {"action": "deop", "name": "Misty"}]},
+    )
+    assert response.status_code == 200
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "succeeded"
+    assert seen["operations"] == [("add", "Brock", True), ("deop", "Misty", False)]
+
+
 def test_onboard_requires_csrf(client):
     client.post("/login", data={"password": "test-password"})
     response = client.post("/api/onboard", json={"name": "Misty", "op": False})
     assert response.status_code == 403
 
 
+def test_player_add_rejects_invalid_name(client, csrf_token):
+    for name in ("Al", "Ash Ketchum", "A" * 17):
+        response = client.post(
+            "/api/players/add",
+            headers={"X-CSRF-Token": csrf_token},
+            json={"name": name},
+        )
+        assert response.status_code == 422
+
+
 def test_backup_enqueues_job(client, app_module, monkeypatch, csrf_token):
     monkeypatch.setattr(app_module, "run_backup", lambda repo_root: ("backup ok", ""))
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.jobs import JobQueue
+
+
+def test_list_returns_newest_first_and_evicts_oldest():
+    jobs = JobQueue(history_limit=2)
+    first = jobs.enqueue("one", lambda: ("", ""))
+    second = jobs.enqueue("two", lambda: ("", ""))
+    third = jobs.enqueue("three", lambda: ("", ""))
+
+    assert [job["action"] for job in jobs.list()] == ["three", "two"]
+    assert jobs.get(first.id) is None
+    assert jobs.get(second.id) is not None
+    assert jobs.get(third.id) is not None
+
+
+def test_zero_history_limit_still_evicts():
+    jobs = JobQueue(history_limit=0)
+    first = jobs.enqueue("one", lambda: ("", ""))
+    second = jobs.enqueue("two", lambda: ("", ""))
+
+    assert [job["action"] for job in jobs.list()] == ["two"]
+    assert jobs.get(first.id) is None
+    assert jobs.get(second.id) is not None
+    assert len(jobs._records) == 1
+
+
+def test_watch_is_woken_by_worker_transitions():
+    jobs = JobQueue()
+    jobs.start()
+    try:
+        record = jobs.enqueue("one", lambda: ("done", ""))
+
+        async def follow() -> dict:
+            snapshot = jobs.get(record.id)
+            while snapshot["status"] not in {"succeeded", "failed"}:
+                snapshot = await jobs.watch(record.id, snapshot["status"], timeout=2.0)
+            return snapshot
+
+        snapshot = asyncio.run(follow())
+        assert snapshot["status"] == "succeeded"
+        assert not jobs._watchers
+    finally:
+        jobs.stop()
@@ -13,18 +13,28 @@ How:
 - Group marker chunks into connected components (8-neighborhood) to approximate
   the number of distinct Pokemarts near spawn.
 
-No external dependencies.
+No external dependencies. If the optional `deflate` package (libdeflate bindings)
+is installed, chunk payloads are inflated with it instead of zlib.
 """
 
 from __future__ import annotations
 
 import argparse
 import gzip
+import os
 import struct
 import sys
 import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+try:
+    import deflate
+except ImportError:
+    deflate = None
 
 TAG_END = 0
 TAG_BYTE = 1
@@ -40,6 +50,13 @@ TAG_COMPOUND = 10
 TAG_INT_ARRAY = 11
 TAG_LONG_ARRAY = 12
 
+_I8 = struct.Struct(">b")
+_I16 = struct.Struct(">h")
+_I32 = struct.Struct(">i")
+_I64 = struct.Struct(">q")
+_U32 = struct.Struct(">I")
+_LOCATIONS = struct.Struct(">1024I")
+
 
 class NBTError(Exception):
     pass
@@ -49,7 +66,11 @@ class _Buf:
     __slots__ = ("b", "o")
 
     def __init__(self, b: bytes):
-        self.b = b
+        self.reset(b)
+
+    def reset(self, b: bytes) -> None:
+        # Slices of a memoryview share the chunk buffer instead of copying it.
+        self.b = memoryview(b).toreadonly()
         self.o = 0
 
     def read_u8(self) -> int:
@@ -62,32 +83,32 @@ class _Buf:
     def read_i8(self) -> int:
         if self.o + 1 > len(self.b):
             raise NBTError("unexpected EOF")
-        v = struct.unpack(">b", self.b[self.o : self.o + 1])[0]
+        v = _I8.unpack_from(self.b, self.o)[0]
         self.o += 1
         return v
 
     def read_i16(self) -> int:
         if self.o + 2 > len(self.b):
             raise NBTError("unexpected EOF")
-        v = struct.unpack(">h", self.b[self.o : self.o + 2])[0]
+        v = _I16.unpack_from(self.b, self.o)[0]
         self.o += 2
         return v
 
     def read_i32(self) -> int:
         if self.o + 4 > len(self.b):
             raise NBTError("unexpected EOF")
-        v = struct.unpack(">i", self.b[self.o : self.o + 4])[0]
+        v = _I32.unpack_from(self.b, self.o)[0]
         self.o += 4
         return v
 
     def read_i64(self) -> int:
         if self.o + 8 > len(self.b):
             raise NBTError("unexpected EOF")
-        v = struct.unpack(">q", self.b[self.o : self.o + 8])[0]
+        v = _I64.unpack_from(self.b, self.o)[0]
         self.o += 8
         return v
 
-    def read_bytes(self, n: int) -> bytes:
+    def read_bytes(self, n: int) -> memoryview:
         if self.o + n > len(self.b):
             raise NBTError("unexpected EOF")
         v = self.b[self.o : self.o + n]
@@ -98,65 +119,99 @@ class _Buf:
         ln = self.read_i16()
         if ln < 0:
             raise NBTError("negative string length")
-        return self.read_bytes(ln).decode("utf-8", errors="strict")
+        return str(self.read_bytes(ln), "utf-8", "strict")
+
+
+_FIXED_SIZES = {TAG_BYTE: 1, TAG_SHORT: 2, TAG_INT: 4, TAG_LONG: 8, TAG_FLOAT: 4, TAG_DOUBLE: 8}
+_ARRAY_ITEM_SIZES = {TAG_BYTE_ARRAY: 1, TAG_INT_ARRAY: 4, TAG_LONG_ARRAY: 8}
+_COMPOUND_FRAME = -1
 
 
 def _skip_payload(tag: int, buf: _Buf) -> None:
-    if tag == TAG_BYTE:
-        buf.read_bytes(1)
-        return
-    if tag == TAG_SHORT:
-        buf.read_bytes(2)
-        return
-    if tag == TAG_INT:
-        buf.read_bytes(4)
-        return
-    if tag == TAG_LONG:
-        buf.read_bytes(8)
-        return
-    if tag == TAG_FLOAT:
-        buf.read_bytes(4)
-        return
-    if tag == TAG_DOUBLE:
-        buf.read_bytes(8)
-        return
-    if tag == TAG_BYTE_ARRAY:
-        ln = buf.read_i32()
-        if ln < 0:
-            raise NBTError("negative byte array length")
-        buf.read_bytes(ln)
-        return
-    if tag == TAG_STRING:
-        _ = buf.read_string()
-        return
-    if tag == TAG_LIST:
-        inner = buf.read_u8()
-        ln = buf.read_i32()
-        if ln < 0:
-            raise NBTError("negative list length")
-        for _ in range(ln):
-            _skip_payload(inner, buf)
-        return
-    if tag == TAG_COMPOUND:
-        while True:
-            t = buf.read_u8()
-            if t == TAG_END:
-                return
-            _ = buf.read_string()
-            _skip_payload(t, buf)
-    if tag == TAG_INT_ARRAY:
-        ln = buf.read_i32()
-        if ln < 0:
-            raise NBTError("negative int array length")
-        buf.read_bytes(4 * ln)
-        return
-    if tag == TAG_LONG_ARRAY:
-        ln = buf.read_i32()
-        if ln < 0:
-            raise NBTError("negative long array length")
-        buf.read_bytes(8 * ln)
-        return
-    raise NBTError(f"unknown tag {tag}")
+    # Iterative walk: open compounds/lists live on an explicit stack as
+    # [inner_tag, remaining] frames (remaining == _COMPOUND_FRAME for compounds),
+    # and fixed-size payloads just advance the offset. Overruns are caught by the
+    # next bounds-checked read or by the final check below. The buffer and offset
+    # are held in locals for the whole walk and written back once at the end.
+    b = buf.b
+    end = len(b)
+    o = buf.o
+    read_i16 = _I16.unpack_from
+    read_i32 = _I32.unpack_from
+    stack: List[List[int]] = []
+    while True:
+        size = _FIXED_SIZES.get(tag)
+        if size is not None:
+            o += size
+        elif tag in _ARRAY_ITEM_SIZES:
+            if o + 4 > end:
+                raise NBTError("unexpected EOF")
+            ln = read_i32(b, o)[0]
+            if ln < 0:
+                raise NBTError("negative array length")
+            o += 4 + ln * _ARRAY_ITEM_SIZES[tag]
+        elif tag == TAG_STRING:
+            if o + 2 > end:
+                raise NBTError("unexpected EOF")
+            ln = read_i16(b, o)[0]
+            if ln < 0:
+                raise NBTError("negative string length")
+            o += 2 + ln
+        elif tag == TAG_LIST:
+            if o + 5 > end:
+                raise NBTError("unexpected EOF")
+            inner = b[o]
+            ln = read_i32(b, o + 1)[0]
+            o += 5
+            if ln < 0:
+                raise NBTError("negative list length")
+            inner_size = _FIXED_SIZES.get(inner)
+            if inner_size is not None:
+                o += ln * inner_size
+            elif ln:
+                stack.append([inner, ln])
+        elif tag == TAG_COMPOUND:
+            stack.append([TAG_END, _COMPOUND_FRAME])
+        else:
+            raise NBTError(f"unknown tag {tag}")
+
+        while stack:
+            frame = stack[-1]
+            if frame[1] == _COMPOUND_FRAME:
+                if o + 1 > end:
+                    raise NBTError("unexpected EOF")
+                tag = b[o]
+                o += 1
+                if tag == TAG_END:
+                    stack.pop()
+                    continue
+                if o + 2 > end:
+                    raise NBTError("unexpected EOF")
+                ln = read_i16(b, o)[0]
+                if ln < 0:
+                    raise NBTError("negative string length")
+                o += 2 + ln
+                break
+            if frame[1] == 0:
+                stack.pop()
+                continue
+            frame[1] -= 1
+            tag = frame[0]
+            break
+        else:
+            if o > end:
+                raise NBTError("unexpected EOF")
+            buf.o = o
+            return
+
+
+def _int_array(code: str, mv: memoryview) -> array:
+    # One packed buffer instead of a PyLong per element; NBT is big-endian.
+    out = array(code)
+    out.frombytes(mv)
+    if sys.byteorder == "little":
+        out.byteswap()
+    return out
 
 
 def _read_payload(tag: int, buf: _Buf):
@@ -178,7 +233,7 @@ def _read_payload(tag: int, buf: _Buf):
         ln = buf.read_i32()
         if ln < 0:
             raise NBTError("negative byte array length")
-        return buf.read_bytes(ln)
+        return bytes(buf.read_bytes(ln))
     if tag == TAG_STRING:
         return buf.read_string()
     if tag == TAG_LIST:
@@ -199,12 +254,12 @@ def _read_payload(tag: int, buf: _Buf):
         ln = buf.read_i32()
         if ln < 0:
             raise NBTError("negative int array length")
-        return [struct.unpack(">i", buf.read_bytes(4))[0] for _ in range(ln)]
+        return _int_array("i", buf.read_bytes(4 * ln))
     if tag == TAG_LONG_ARRAY:
         ln = buf.read_i32()
         if ln < 0:
             raise NBTError("negative long array length")
-        return [struct.unpack(">q", buf.read_bytes(8))[0] for _ in range(ln)]
+        return _int_array("q", buf.read_bytes(8 * ln))
     raise NBTError(f"unknown tag {tag}")
 
 
@@ -240,12 +295,21 @@ def read_spawn(world: Path) -> Tuple[int, int, int]:
     return sx, sy, sz
 
 
-def _read_chunk_raw(region_file: Path, local_x: int, local_z: int) -> Optional[bytes]:
-    b = region_file.read_bytes()
-    if len(b) < 8192:
-        return None
-    idx = local_x + local_z * 32
-    loc = struct.unpack(">I", b[idx * 4 : idx * 4 + 4])[0]
+def _inflate_zlib(payload: memoryview) -> bytes:
+    if deflate is not None:
+        # libdeflate needs an output bound up front; grow the guess a few times
+        # before leaving oversized or corrupt payloads to zlib.
+        size = max(len(payload) * 8, 1 << 16)
+        for _ in range(3):
+            try:
+                # libdeflate hands back a bytearray; the walker needs hashable slices.
+                return bytes(deflate.zlib_decompress(payload, size))
+            except deflate.DeflateError:
+                size *= 4
+    return zlib.decompress(payload)
+
+
+def _read_chunk_at(b: memoryview, loc: int) -> Optional[bytes]:
     off_sectors = (loc >> 8) & 0xFFFFFF
     sector_count = loc & 0xFF
     if off_sectors == 0 or sector_count == 0:
@@ -253,47 +317,189 @@ def _read_chunk_raw(region_file: Path, local_x: int, local_z: int) -> Optional[b
     off = off_sectors * 4096
     if off + 5 > len(b):
         return None
-    length = struct.unpack(">I", b[off : off + 4])[0]
+    length = _U32.unpack_from(b, off)[0]
     compression = b[off + 4]
     payload = b[off + 5 : off + 4 + length]
     if compression == 1:
         return gzip.decompress(payload)
     if compression == 2:
-        return zlib.decompress(payload)
+        return _inflate_zlib(payload)
     if compression == 3:
-        return payload
+        return bytes(payload)
     return None
 
 
-def _chunk_palette_markers(chunk_root: Dict, markers: Set[str]) -> Set[str]:
-    sections = chunk_root.get("sections")
-    if not isinstance(sections, list):
-        level = chunk_root.get("Level")
-        if isinstance(level, dict):
-            sections = level.get("Sections")
-    if not isinstance(sections, list):
-        return set()
+class _AllMarkersFound(Exception):
+    """Unwinds the palette walk once every marker has been seen in the chunk."""
+
+
+# Palette block names, for 1.18+ chunks and the older Level-wrapped layout, as a
+# trie of raw tag names. A None leaf marks the Name string itself.
+_PALETTE_ENTRY = {b"block_states": {b"palette": {b"Name": None}}}
+_PALETTE_NAME_TRIE: Dict[bytes, Optional[Dict]] = {
+    b"sections": _PALETTE_ENTRY,
+    b"Level": {b"Sections": _PALETTE_ENTRY},
+}
+_MISSING = object()
+
+
+def _walk_selected(tag: int, buf: _Buf, node: Dict[bytes, Optional[Dict]], markers: Dict[bytes, str], found: Set[str]) -> None:
+    """Walk only the compounds/lists leading to palette names; skip everything else.
+
+    Child tag names are looked up in the trie as memoryview slices, so names of
+    skipped tags are never copied or decoded.
+    """
+    if tag == TAG_COMPOUND:
+        # Same local fast path as _skip_payload; buf.o is synced around calls out.
+        b = buf.b
+        end = len(b)
+        o = buf.o
+        read_i16 = _I16.unpack_from
+        while True:
+            if o + 1 > end:
+                raise NBTError("unexpected EOF")
+            t = b[o]
+            o += 1
+            if t == TAG_END:
+                buf.o = o
+                return
+            if o + 2 > end:
+                raise NBTError("unexpected EOF")
+            ln = read_i16(b, o)[0]
+            if ln < 0:
+                raise NBTError("negative string length")
+            o += 2
+            if o + ln > end:
+                raise NBTError("unexpected EOF")
+            child = node.get(b[o : o + ln], _MISSING)
+            o += ln
+            if child is None and t == TAG_STRING:
+                if o + 2 > end:
+                    raise NBTError("unexpected EOF")
+                ln = read_i16(b, o)[0]
+                if ln < 0:
+                    raise NBTError("negative string length")
+                o += 2
+                if o + ln > end:
+                    raise NBTError("unexpected EOF")
+                # Palette names are matched as raw UTF-8; only hits map back to a str.
+                name = markers.get(b[o : o + ln])
+                o += ln
+                if name is not None:
+                    found.add(name)
+                    if len(found) == len(markers):
+                        raise _AllMarkersFound
+                continue
+            buf.o = o
+            if child is not _MISSING and child is not None and t in (TAG_COMPOUND, TAG_LIST):
+                _walk_selected(t, buf, child, markers, found)
+            else:
+                _skip_payload(t, buf)
+            o = buf.o
+    if tag == TAG_LIST:
+        inner = buf.read_u8()
+        ln = buf.read_i32()
+        if ln < 0:
+            raise NBTError("negative list length")
+        if inner in (TAG_COMPOUND, TAG_LIST):
+            for _ in range(ln):
+                _walk_selected(inner, buf, node, markers, found)
+        else:
+            for _ in range(ln):
+                _skip_payload(inner, buf)
+        return
+    _skip_payload(tag, buf)
+
 
+@lru_cache(maxsize=8)
+def _marker_lookup(markers: FrozenSet[str]) -> Dict[bytes, str]:
+    return {marker.encode("utf-8"): sys.intern(marker) for marker in markers}
+
+
+def _load_palette_names(raw: bytes, markers: Set[str], buf: Optional[_Buf] = None) -> Set[str]:
+    """Return the markers used in a chunk's section palettes without building its NBT tree.
+
+    A region scan passes one ``buf`` for all of its chunks; it is re-seated on ``raw``.
+    """
+    # A palette Name is stored verbatim as UTF-8, so a marker whose bytes never
+    # occur in the chunk cannot be in any palette. Most chunks stop here.
+    lookup = {encoded: marker for encoded, marker in _marker_lookup(frozenset(markers)).items() if encoded in raw}
+    if not lookup:
+        return set()
+    if buf is None:
+        buf = _Buf(raw)
+    else:
+        buf.reset(raw)
+    root_tag = buf.read_u8()
+    if root_tag != TAG_COMPOUND:
+        raise NBTError(f"root is not compound (tag={root_tag})")
+    _ = buf.read_string()
     found: Set[str] = set()
-    for sec in sections:
-        if not isinstance(sec, dict):
+    try:
+        _walk_selected(TAG_COMPOUND, buf, _PALETTE_NAME_TRIE, lookup, found)
+    except _AllMarkersFound:
+        pass
+    return found
+
+
+def _list_region_files(region_dir: Path) -> Dict[Tuple[int, int], Path]:
+    """Map (rx, rz) to region files with one directory listing instead of a stat per region."""
+    present: Dict[Tuple[int, int], Path] = {}
+    try:
+        entries = list(os.scandir(region_dir))
+    except FileNotFoundError:
+        return present
+    for entry in entries:
+        parts = entry.name.split(".")
+        if len(parts) != 4 or parts[0] != "r" or parts[3] != "mca":
             continue
-        block_states = sec.get("block_states")
-        if not isinstance(block_states, dict):
+        try:
+            present[(int(parts[1]), int(parts[2]))] = Path(entry.path)
+        except ValueError:
             continue
-        palette = block_states.get("palette")
-        if not isinstance(palette, list):
+    return present
+
+
+def _scan_region(
+    region_file: Path, rx: int, rz: int, bounds: Tuple[int, int, int, int], markers: FrozenSet[str]
+) -> List[Tuple[int, int, Set[str]]]:
+    min_cx, max_cx, min_cz, max_cz = bounds
+    region = memoryview(region_file.read_bytes())
+    if len(region) < 8192:
+        return []
+    # Walk the 1024-entry location table once; empty slots and chunks outside
+    # the scan box are dropped before touching any chunk data. The rest are read
+    # in sector order (the high bits of loc) so the file is consumed front to back.
+    wanted: List[Tuple[int, int, int]] = []
+    for idx, loc in enumerate(_LOCATIONS.unpack_from(region, 0)):
+        if not loc:
             continue
-        for entry in palette:
-            if not isinstance(entry, dict):
-                continue
-            name = entry.get("Name")
-            if isinstance(name, str) and name in markers:
-                found.add(name)
-    return found
+        cx = rx * 32 + (idx & 31)
+        cz = rz * 32 + (idx >> 5)
+        if cx < min_cx or cx > max_cx or cz < min_cz or cz > max_cz:
+            continue
+        wanted.append((loc, cx, cz))
+    wanted.sort()
+
+    hits: List[Tuple[int, int, Set[str]]] = []
+    buf = _Buf(b"")
+    for loc, cx, cz in wanted:
+        raw = _read_chunk_at(region, loc)
+        if raw is None:
+            continue
+        try:
+            found = _load_palette_names(raw, markers, buf)
+        except Exception:
+            continue
+        if found:
+            hits.append((cx, cz, found))
+    return hits
 
 
-def detect_markers_near_spawn(world: Path, radius: int, markers: Set[str]) -> Tuple[Tuple[int, int, int], List[Tuple[int, int, Set[str]]]]:
+def detect_markers_near_spawn(
+    world: Path, radius: int, markers: Set[str], jobs: int = 1
+) -> Tuple[Tuple[int, int, int], List[Tuple[int, int, Set[str]]]]:
+    markers = frozenset(markers)
     sx, sy, sz = read_spawn(world)
     min_x = sx - radius
     max_x = sx + radius
@@ -304,30 +510,33 @@ def detect_markers_near_spawn(world: Path, radius: int, markers: Set[str]) -> Tu
     min_cz = min_z // 16
     max_cz = max_z // 16
 
-    region_dir = world / "region"
+    present = _list_region_files(world / "region")
+    bounds = (min_cx, max_cx, min_cz, max_cz)
+    regions: List[Tuple[Path, int, int]] = []
+    for rx in range(min_cx >> 5, (max_cx >> 5) + 1):
+        for rz in range(min_cz >> 5, (max_cz >> 5) + 1):
+            rp = present.get((rx, rz))
+            if rp is not None:
+                regions.append((rp, rx, rz))
+
+    # Chunks are independent; one task per region file keeps each worker on a single file.
     hits: List[Tuple[int, int, Set[str]]] = []
+    if jobs > 1 and len(regions) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(regions))) as pool:
+            futures = [pool.submit(_scan_region, rp, rx, rz, bounds, markers) for rp, rx, rz in regions]
+            for future in futures:
+                hits.extend(future.result())
+    else:
+        for rp, rx, rz in regions:
+            hits.extend(_scan_region(rp, rx, rz, bounds, markers))
+
+    hits.sort(key=lambda hit: (hit[0], hit[1]))
+    return (sx, sy, sz), hits
 
-    for cx in range(min_cx, max_cx + 1):
-        for cz in range(min_cz, max_cz + 1):
-            rx = cx >> 5
-            rz = cz >> 5
-            lx = cx & 31
-            lz = cz & 31
-            rp = region_dir / f"r.{rx}.{rz}.mca"
-            if not rp.exists():
-                continue
-            raw = _read_chunk_raw(rp, lx, lz)
-            if raw is None:
-                continue
-            try:
-                root = _load_nbt(raw)
-            except Exception:
-                continue
-            found = _chunk_palette_markers(root, markers)
-            if found:
-                hits.append((cx, cz, found))
 
-    return (sx, sy, sz), hits
+# Half of the 8-neighbourhood in packed form (+x-z, +x, +x+z, +z): the other half
+# links back from the neighbour's side.
+_HALF_NEIGHBOUR_OFFSETS = ((1 << 32) - 1, 1 << 32, (1 << 32) + 1, 1)
 
 
 def _cluster_hit_chunks(hits: List[Tuple[int, int, Set[str]]]) -> List[Tuple[List[Tuple[int, int]], Set[str]]]:
@@ -335,27 +544,44 @@ def _cluster_hit_chunks(hits: List[Tuple[int, int, Set[str]]]) -> List[Tuple[Lis
     for cx, cz, found in hits:
         by_coord.setdefault((cx, cz), set()).update(found)
 
-    remaining: Set[Tuple[int, int]] = set(by_coord.keys())
-    components: List[Tuple[List[Tuple[int, int]], Set[str]]] = []
-
-    while remaining:
-        start = remaining.pop()
-        stack = [start]
-        coords: List[Tuple[int, int]] = [start]
-        comp_markers: Set[str] = set(by_coord[start])
-
-        while stack:
-            x, z = stack.pop()
-            for nx in range(x - 1, x + 2):
-                for nz in range(z - 1, z + 2):
-                    key = (nx, nz)
-                    if key in remaining:
-                        remaining.remove(key)
-                        stack.append(key)
-                        coords.append(key)
-                        comp_markers.update(by_coord[key])
-
-        components.append((coords, comp_markers))
+    # Union-find over integer ids: link each hit chunk to its hit neighbours, then
+    # bucket chunks by root.
+    # Coordinates are packed as (cx << 32) + cz, so neighbour keys are one int add.
+    coords = list(by_coord)
+    ids = {(x << 32) + z: i for i, (x, z) in enumerate(coords)}
+    parent = list(range(len(coords)))
+    rank = [0] * len(coords)
+
+    def find(i: int) -> int:
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(a: int, b: int) -> None:
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            return
+        if rank[ra] < rank[rb]:
+            ra, rb = rb, ra
+        parent[rb] = ra
+        if rank[ra] == rank[rb]:
+            rank[ra] += 1
+
+    for key, i in ids.items():
+        for offset in _HALF_NEIGHBOUR_OFFSETS:
+            j = ids.get(key + offset)
+            if j is not None:
+                union(i, j)
+
+    groups: Dict[int, Tuple[List[Tuple[int, int]], Set[str]]] = {}
+    for i, coord in enumerate(coords):
+        comp_coords, comp_markers = groups.setdefault(find(i), ([], set()))
+        comp_coords.append(coord)
+        comp_markers.update(by_coord[coord])
+    components: List[Tuple[List[Tuple[int, int]], Set[str]]] = list(groups.values())
 
     components.sort(
         key=lambda c: (
@@ -376,6 +602,12 @@ def main(argv: Sequence[str]) -> int:
         default="cobblemon:blue_plaque,cobblemon:saccharine_wall_hanging_sign,cobblemon:saccharine_hanging_sign",
         help="Comma-separated marker block ids",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes used to scan region files in parallel (default: CPU count)",
+    )
     ap.add_argument(
         "--min-components",
         type=int,
@@ -406,7 +638,7 @@ def main(argv: Sequence[str]) -> int:
         return 2
 
     try:
-        spawn, hits = detect_markers_near_spawn(world, args.radius, marker_set)
+        spawn, hits = detect_markers_near_spawn(world, args.radius, marker_set, jobs=args.jobs)
     except Exception as e:
         print(f"ERROR: {e}", file=sys.stderr)
         return 2
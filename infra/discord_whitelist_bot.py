@@ -16,18 +16,26 @@ import json
 import logging
 import os
 import re
+import shlex
+import signal
+import string
 import subprocess
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import BinaryIO, Optional, Sequence
 
 import discord
 from discord import app_commands
 
 
 LOG = logging.getLogger("discord_whitelist_bot")
-MC_NAME_RE = re.compile(r"^[A-Za-z0-9_]{3,16}$")
-JOIN_LINE_RE = re.compile(r"]:\s+([A-Za-z0-9_]{3,16}) joined the game$")
+JOIN_LINE_RE = re.compile(rb"]:\s+([A-Za-z0-9_]{3,16}) joined the game$")
+PLAYER_STATUS_TTL_SEC = 3.0
+STARTER_WATCH_POLL_SEC = 0.5
+JOIN_BATCH_WINDOW_SEC = 0.5
+JOIN_BATCH_MAX = 32
 
 
 def _parse_id_set(raw: str) -> set[int]:
@@ -94,6 +102,91 @@ class Config:
         )
 
 
+class _ShellUnavailable(RuntimeError):
+    pass
+
+
+class _PersistentShell:
+    """One bash reused by _run_script; each command's stdout ends with ``\\0<rc>\\0``."""
+
+    def __init__(self, cwd: Path) -> None:
+        self._cwd = cwd
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        fd, stderr_path = tempfile.mkstemp(prefix="mc-bot-", suffix=".stderr")
+        os.close(fd)
+        self._stderr_path = Path(stderr_path)
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self, args: Sequence[str], timeout: int) -> subprocess.CompletedProcess[str]:
+        async with self._lock:
+            try:
+                if self._proc is None or self._proc.returncode is not None:
+                    self._proc = await asyncio.create_subprocess_exec(
+                        "bash",
+                        "--noprofile",
+                        "--norc",
+                        cwd=str(self._cwd),
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.DEVNULL,
+                        start_new_session=True,
+                        limit=1 << 20,
+                    )
+                proc = self._proc
+                assert proc.stdin is not None and proc.stdout is not None
+                err = shlex.quote(str(self._stderr_path))
+                line = f"( {shlex.join(args)} ) </dev/null 2>{err}; printf '\\0%d\\0' \"$?\"\n"
+                proc.stdin.write(line.encode("utf-8"))
+                await proc.stdin.drain()
+            except OSError as exc:
+                await self._kill()
+                raise _ShellUnavailable(str(exc)) from exc
+
+            # The command may have run from here on: report failures, never retry.
+            try:
+                stdout_b, rc = await asyncio.wait_for(self._read_frame(proc.stdout), timeout=timeout)
+            except asyncio.TimeoutError:
+                await self._kill()
+                return subprocess.CompletedProcess(list(args), 124, "", f"\nTimed out after {timeout}s")
+            except asyncio.LimitOverrunError:
+                await self._kill()
+                return subprocess.CompletedProcess(list(args), 1, "", "\nOutput too large (over 1 MiB)")
+            except (asyncio.IncompleteReadError, ValueError):
+                await self._kill()
+                return subprocess.CompletedProcess(list(args), 1, "", "\nShell exited before the command finished")
+            stderr_b = self._stderr_path.read_bytes()
+        return subprocess.CompletedProcess(
+            list(args),
+            rc,
+            stdout_b.decode("utf-8", errors="replace"),
+            stderr_b.decode("utf-8", errors="replace"),
+        )
+
+    @staticmethod
+    async def _read_frame(stdout: asyncio.StreamReader) -> tuple[bytes, int]:
+        output = await stdout.readuntil(b"\0")
+        rc = await stdout.readuntil(b"\0")
+        return output[:-1], int(rc[:-1])
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._kill()
+        with contextlib.suppress(OSError):
+            self._stderr_path.unlink()
+
+    async def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        with contextlib.suppress(ProcessLookupError):
+            os.killpg(proc.pid, signal.SIGKILL)
+        await proc.wait()
+
+
 class McBot(discord.Client):
     def __init__(self, cfg: Config) -> None:
         intents = discord.Intents.default()
@@ -105,6 +198,10 @@ class McBot(discord.Client):
         )
         self.tree.add_command(self.mc_group)
         self._starter_watch_task: Optional[asyncio.Task[None]] = None
+        self._status_cache: dict[str, tuple[float, dict]] = {}
+        self._pending_joins: dict[str, None] = {}
+        self._join_flush_task: Optional[asyncio.Task[None]] = None
+        self._shell = _PersistentShell(cfg.repo_root)
         self._register_commands()
 
     async def setup_hook(self) -> None:
@@ -122,10 +219,12 @@ class McBot(discord.Client):
             LOG.info("Starter watch enabled (log=%s)", self.cfg.starter_log_file)
 
     async def close(self) -> None:
-        if self._starter_watch_task is not None:
-            self._starter_watch_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._starter_watch_task
+        for task in (self._starter_watch_task, self._join_flush_task):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        await self._shell.close()
         await super().close()
 
     def _register_commands(self) -> None:
@@ -150,7 +249,7 @@ class McBot(discord.Client):
             if not await self._authorize(interaction):
                 return
             pseudo = pseudo.strip()
-            if not MC_NAME_RE.fullmatch(pseudo):
+            if not _valid_pseudo(pseudo):
                 await interaction.response.send_message(
                     "Pseudo invalide (attendu: 3-16 caracteres [A-Za-z0-9_]).",
                     ephemeral=True,
@@ -176,7 +275,7 @@ class McBot(discord.Client):
             if not await self._authorize(interaction):
                 return
             pseudo = pseudo.strip()
-            if not MC_NAME_RE.fullmatch(pseudo):
+            if not _valid_pseudo(pseudo):
                 await interaction.response.send_message(
                     "Pseudo invalide (attendu: 3-16 caracteres [A-Za-z0-9_]).",
                     ephemeral=True,
@@ -207,6 +306,7 @@ class McBot(discord.Client):
                 )
                 return
 
+            self._status_cache.pop(pseudo, None)
             await interaction.followup.send(
                 (
                     f"`{pseudo}` ajoute a la whitelist.\n"
@@ -225,7 +325,7 @@ class McBot(discord.Client):
             if not await self._authorize(interaction):
                 return
             pseudo = pseudo.strip()
-            if not MC_NAME_RE.fullmatch(pseudo):
+            if not _valid_pseudo(pseudo):
                 await interaction.response.send_message(
                     "Pseudo invalide (attendu: 3-16 caracteres [A-Za-z0-9_]).",
                     ephemeral=True,
@@ -300,6 +400,11 @@ class McBot(discord.Client):
         return True
 
     async def _player_status(self, pseudo: str) -> dict | str:
+        # A check followed by a whitelist (or repeated checks) reuses one
+        # player-check.sh run for a few seconds. Failures are not cached.
+        cached = self._status_cache.get(pseudo)
+        if cached is not None and time.monotonic() - cached[0] < PLAYER_STATUS_TTL_SEC:
+            return cached[1]
         result = await self._run_script(["bash", "infra/player-check.sh", "--json", pseudo])
         if result.returncode != 0:
             return (
@@ -307,111 +412,179 @@ class McBot(discord.Client):
                 f"```text\n{_short(result.stderr or result.stdout)}\n```"
             )
         try:
-            return json.loads(result.stdout or "{}")
+            status = json.loads(result.stdout or "{}")
         except json.JSONDecodeError:
             return f"Sortie invalide de player-check:\n```text\n{_short(result.stdout)}\n```"
+        self._status_cache[pseudo] = (time.monotonic(), status)
+        return status
 
     async def _run_script(self, args: Sequence[str]) -> subprocess.CompletedProcess[str]:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: _run_command(self.cfg, args))
+        LOG.info("Run command: %s", " ".join(args))
+        # The persistent shell serves one command at a time; concurrent commands
+        # (or a dead shell) go straight to a fresh process instead of queueing.
+        if not self._shell.busy:
+            try:
+                return await self._shell.run(args, self.cfg.command_timeout_sec)
+            except _ShellUnavailable as exc:
+                LOG.warning("Persistent shell unavailable (%s); running directly", exc)
+        return await self._exec_script(args)
+
+    async def _exec_script(self, args: Sequence[str]) -> subprocess.CompletedProcess[str]:
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=str(self.cfg.repo_root),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        try:
+            stdout_b, stderr_b = await asyncio.wait_for(
+                proc.communicate(), timeout=self.cfg.command_timeout_sec
+            )
+        except asyncio.TimeoutError:
+            # The script runs in its own session: kill the whole group so children
+            # (docker exec, rcon...) do not keep the pipes open.
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(proc.pid, signal.SIGKILL)
+            await proc.wait()
+            stderr = f"\nTimed out after {self.cfg.command_timeout_sec}s"
+            return subprocess.CompletedProcess(list(args), 124, "", stderr)
+        return subprocess.CompletedProcess(
+            list(args),
+            proc.returncode,
+            stdout_b.decode("utf-8", errors="replace"),
+            stderr_b.decode("utf-8", errors="replace"),
+        )
 
     async def _starter_watch_loop(self) -> None:
-        log_file = str(self.cfg.starter_log_file)
-        while not self.is_closed():
-            proc: Optional[asyncio.subprocess.Process] = None
-            try:
-                if not self.cfg.starter_log_file.exists():
-                    LOG.warning("Starter watch log file missing: %s", log_file)
-                    await asyncio.sleep(5)
-                    continue
-
-                proc = await asyncio.create_subprocess_exec(
-                    "tail",
-                    "-n",
-                    "0",
-                    "-F",
-                    log_file,
-                    cwd=str(self.cfg.repo_root),
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.STDOUT,
-                )
-                LOG.info("Starter watch tail started pid=%s", proc.pid)
-
-                assert proc.stdout is not None
-                while True:
-                    line_b = await proc.stdout.readline()
-                    if not line_b:
-                        break
-                    line = line_b.decode("utf-8", errors="replace").rstrip("\r\n")
-                    match = JOIN_LINE_RE.search(line)
-                    if not match:
+        # Follow the server log like `tail -n 0 -F`: start at the end, poll for new
+        # bytes, and reopen from the start when the file is rotated or truncated.
+        log_file = self.cfg.starter_log_file
+        fh: Optional[BinaryIO] = None
+        inode: Optional[int] = None
+        pending = b""
+        from_start = False
+        try:
+            while not self.is_closed():
+                try:
+                    if fh is None:
+                        if not log_file.exists():
+                            LOG.warning("Starter watch log file missing: %s", log_file)
+                            await asyncio.sleep(5)
+                            from_start = True
+                            continue
+                        fh = log_file.open("rb")
+                        if not from_start:
+                            fh.seek(0, os.SEEK_END)
+                        inode = os.fstat(fh.fileno()).st_ino
+                        pending = b""
+                        LOG.info("Starter watch following %s", log_file)
+
+                    data = fh.read()
+                    if data:
+                        *lines, pending = (pending + data).split(b"\n")
+                        for line_b in lines:
+                            await self._handle_log_line(line_b)
                         continue
 
-                    player = match.group(1)
-                    LOG.info("Join detected for %s; draining starter queue", player)
-                    res = await self._run_script(["bash", "infra/starter.sh", "--drain-pending", player])
-                    if res.returncode != 0:
-                        LOG.warning(
-                            "starter drain rc=%s player=%s out=%s",
-                            res.returncode,
-                            player,
-                            _short(res.stderr or res.stdout, 300),
-                        )
+                    try:
+                        st = os.stat(log_file)
+                    except FileNotFoundError:
+                        st = None
+                    if st is None or st.st_ino != inode:
+                        LOG.info("Starter watch log rotated; reopening %s", log_file)
+                        fh.close()
+                        fh = None
+                        from_start = True
                         continue
+                    if st.st_size < fh.tell():
+                        LOG.info("Starter watch log truncated; reading from start")
+                        fh.seek(0)
+                        pending = b""
+                        continue
+                    await asyncio.sleep(STARTER_WATCH_POLL_SEC)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    LOG.exception("Starter watch loop error; retry in 5s")
+                    if fh is not None:
+                        fh.close()
+                        fh = None
+                    await asyncio.sleep(5)
+        finally:
+            if fh is not None:
+                fh.close()
+
+    async def _handle_log_line(self, line_b: bytes) -> None:
+        # Matched on raw bytes: most log lines are not joins and are never decoded.
+        match = JOIN_LINE_RE.search(line_b.rstrip(b"\r\n"))
+        if not match:
+            return
+
+        player = match.group(1).decode("ascii")
+        LOG.info("Join detected for %s; draining starter queue", player)
+        self._pending_joins[player] = None
+        if self._join_flush_task is None or self._join_flush_task.done():
+            self._join_flush_task = asyncio.create_task(self._flush_joins())
+
+    async def _flush_joins(self) -> None:
+        # Joins arriving within JOIN_BATCH_WINDOW_SEC of the first one (a burst
+        # after a restart) share one starter.sh run. Batches run one at a time,
+        # so the pending file is never edited concurrently.
+        await asyncio.sleep(JOIN_BATCH_WINDOW_SEC)
+        while self._pending_joins:
+            players = list(self._pending_joins)[:JOIN_BATCH_MAX]
+            for player in players:
+                del self._pending_joins[player]
+            await self._drain_starters(players)
+
+    async def _drain_starters(self, players: list[str]) -> None:
+        res = await self._run_script(["bash", "infra/starter.sh", "--drain-pending", *players])
+        if res.returncode != 0:
+            LOG.warning(
+                "starter drain rc=%s players=%s out=%s",
+                res.returncode,
+                ",".join(players),
+                _short(res.stderr or res.stdout, 300),
+            )
+            return
 
-                    out = (res.stdout or "").strip()
-                    if out and "starter_pending_absent=" not in out:
-                        LOG.info("starter drain player=%s out=%s", player, _short(out, 300))
-
-                rc = await proc.wait()
-                LOG.warning("Starter watch tail exited rc=%s; retrying", rc)
-                await asyncio.sleep(2)
-            except asyncio.CancelledError:
-                if proc is not None and proc.returncode is None:
-                    proc.terminate()
-                    with contextlib.suppress(Exception):
-                        await asyncio.wait_for(proc.wait(), timeout=2)
-                raise
-            except FileNotFoundError:
-                LOG.warning("tail command not found; starter watch disabled for this run")
-                return
-            except Exception:
-                LOG.exception("Starter watch loop error; retry in 5s")
-                if proc is not None and proc.returncode is None:
-                    proc.kill()
-                    with contextlib.suppress(Exception):
-                        await proc.wait()
-                await asyncio.sleep(5)
-
-
-def _run_command(cfg: Config, args: Sequence[str]) -> subprocess.CompletedProcess[str]:
-    LOG.info("Run command: %s", " ".join(args))
-    env = os.environ.copy()
-    try:
-        return subprocess.run(
-            list(args),
-            cwd=str(cfg.repo_root),
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=cfg.command_timeout_sec,
-            check=False,
+        out = "\n".join(
+            line
+            for line in (res.stdout or "").strip().splitlines()
+            if not line.startswith("starter_pending_absent=")
         )
-    except subprocess.TimeoutExpired as exc:
-        stdout = exc.stdout or ""
-        stderr = (exc.stderr or "") + f"\nTimed out after {cfg.command_timeout_sec}s"
-        return subprocess.CompletedProcess(list(args), 124, stdout, stderr)
+        if out:
+            LOG.info("starter drain players=%s out=%s", ",".join(players), _short(out, 300))
+
+
+_PSEUDO_CHARS = (string.ascii_letters + string.digits + "_").encode("ascii")
+
+
+def _valid_pseudo(pseudo: str) -> bool:
+    # Same rule as ^[A-Za-z0-9_]{3,16}$: delete every allowed byte, nothing may remain.
+    if not 3 <= len(pseudo) <= 16 or not pseudo.isascii():
+        return False
+    return not pseudo.encode("ascii").translate(None, _PSEUDO_CHARS)
 
 
 def _short(text: str, max_chars: int = 1500) -> str:
-    text = (text or "").replace("\r", "")
+    if not text:
+        return ""
+    if len(text) <= max_chars and "\r" not in text:
+        return text
+    text = text.replace("\r", "")
     if len(text) <= max_chars:
         return text
     return text[: max_chars - 3] + "..."
 
 
 def _clip_discord(text: str, max_chars: int = 1900) -> str:
-    text = (text or "").strip()
+    if not text:
+        return ""
+    if len(text) <= max_chars and not text[0].isspace() and not text[-1].isspace():
+        return text
+    text = text.strip()
     if len(text) <= max_chars:
         return text
     return text[: max_chars - 3] + "..."
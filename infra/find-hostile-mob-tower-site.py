@@ -6,14 +6,38 @@ import json
 import math
 import sys
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from hostile_mob_tower_spec import geometry
 from world_tools import WorldReader, is_air, is_liquid, read_world_spawn
 
 
-def candidate_origins(
+@lru_cache(maxsize=8)
+def _candidate_rings(
+    spawn_x: int, spawn_z: int, min_distance: int, max_distance: int, step: int, preferred_radius: int
+) -> Dict[int, Tuple[Tuple[int, int, int], ...]]:
+    # Grid points bucketed by |dist - preferred_radius|, each bucket holding
+    # (dist, x, z). Deterministic per spawn and parameters, hence memoized.
+    x_start = (spawn_x - max_distance) // step * step
+    x_end = (spawn_x + max_distance) // step * step
+    z_start = (spawn_z - max_distance) // step * step
+    z_end = (spawn_z + max_distance) // step * step
+
+    rings: Dict[int, List[Tuple[int, int, int]]] = {}
+    for x in range(x_start, x_end + 1, step):
+        for z in range(z_start, z_end + 1, step):
+            dist = int(round(math.hypot(x - spawn_x, z - spawn_z)))
+            if dist < min_distance or dist > max_distance:
+                continue
+            rings.setdefault(abs(dist - preferred_radius), []).append((dist, x, z))
+    return {delta: tuple(pts) for delta, pts in rings.items()}
+
+
+def iter_candidate_origins(
     spawn_x: int,
     spawn_z: int,
     *,
@@ -21,27 +45,41 @@ def candidate_origins(
     max_distance: int,
     step: int,
     preferred_radius: Optional[int] = None,
-) -> List[Tuple[int, int]]:
+) -> Iterator[Tuple[int, int]]:
+    """Yield origins ordered by (|dist - preferred_radius|, dist, x, z), sorting one ring at a time."""
     if preferred_radius is None:
         preferred_radius = (min_distance + max_distance) // 2
+    rings = _candidate_rings(spawn_x, spawn_z, min_distance, max_distance, step, preferred_radius)
+    for delta in sorted(rings):
+        for _dist, x, z in sorted(rings[delta]):
+            yield x, z
 
-    x_start = (spawn_x - max_distance) // step * step
-    x_end = (spawn_x + max_distance) // step * step
-    z_start = (spawn_z - max_distance) // step * step
-    z_end = (spawn_z + max_distance) // step * step
 
-    pts: List[Tuple[int, int, int, int]] = []
-    for x in range(x_start, x_end + 1, step):
-        for z in range(z_start, z_end + 1, step):
-            dist = int(round(math.hypot(x - spawn_x, z - spawn_z)))
-            if dist < min_distance or dist > max_distance:
-                continue
-            pts.append((abs(dist - preferred_radius), dist, x, z))
-    pts.sort(key=lambda item: (item[0], item[1], item[2], item[3]))
-    return [(x, z) for _pref_delta, _dist, x, z in pts]
+def candidate_origins(
+    spawn_x: int,
+    spawn_z: int,
+    *,
+    min_distance: int,
+    max_distance: int,
+    step: int,
+    preferred_radius: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    return list(
+        iter_candidate_origins(
+            spawn_x,
+            spawn_z,
+            min_distance=min_distance,
+            max_distance=max_distance,
+            step=step,
+            preferred_radius=preferred_radius,
+        )
+    )
 
 
+@lru_cache(maxsize=None)
 def _obstruction_weight(name: str) -> float:
+    # Memoized per block name: a world only uses a few hundred distinct names, so
+    # after warm-up each lookup is one dict hit instead of six substring scans.
     if is_air(name):
         return 0.0
     if any(tok in name for tok in ("leaves", "vine", "grass", "fern", "flower", "snow")):
@@ -66,46 +104,56 @@ def evaluate_site(
             for cz in range(z1 >> 4, (z2 >> 4) + 1):
                 if not region_exists(cx, cz):
                     return None
-    heights: List[int] = []
-    surface_blocks: Dict[Tuple[int, int], str] = {}
-
-    for x in range(x1, x2 + 1):
-        for z in range(z1, z2 + 1):
-            try:
-                y = world.height_at(x, z)
-            except Exception:
-                return None
-            heights.append(y)
-            surface_blocks[(x, z)] = world.block_name(x, y, z)
-
+    # Readers that can hand back the whole rectangle decode each chunk's heightmap
+    # once; anything else falls back to one height_at call per column.
+    heights_rect = getattr(world, "heights_rect", None)
+    try:
+        if callable(heights_rect):
+            rows = heights_rect(x1, z1, x2, z2)
+        else:
+            rows = [[world.height_at(x, z) for z in range(z1, z2 + 1)] for x in range(x1, x2 + 1)]
+    except Exception:
+        return None
+    heights: List[int] = [y for row in rows for y in row]
     if not heights:
         return None
 
-    surface_mode = Counter(heights).most_common(1)[0][0]
-    if max(heights) - min(heights) > 1:
+    # Height checks first: rough terrain is rejected before any block is read.
+    surface_min = min(heights)
+    surface_max = max(heights)
+    if surface_max - surface_min > 1:
         return None
+    surface_mode = Counter(heights).most_common(1)[0][0]
     if surface_mode < min_surface_y or surface_mode > max_surface_y:
         return None
-    if any(is_liquid(name) for name in surface_blocks.values()):
-        return None
+    for x, row in zip(range(x1, x2 + 1), rows):
+        for z, y in zip(range(z1, z2 + 1), row):
+            if is_liquid(world.block_name(x, y, z)):
+                return None
 
     g = geometry((origin_x, surface_mode, origin_z), floors)
     bx1, by1, bz1, bx2, by2, bz2 = g.clear_bbox
+    # Weights are never negative, so checking the budget once per column rejects
+    # exactly the sites the per-block check did.
+    column_names = getattr(world, "column_names", None)
     obstruction = 0.0
     for x in range(bx1, bx2 + 1):
         for z in range(bz1, bz2 + 1):
-            for y in range(by1, by2 + 1):
-                obstruction += _obstruction_weight(world.block_name(x, y, z))
-                if obstruction > 96:
-                    return None
+            if callable(column_names):
+                names = column_names(x, z, by1, by2)
+            else:
+                names = [world.block_name(x, y, z) for y in range(by1, by2 + 1)]
+            obstruction += sum(map(_obstruction_weight, names))
+            if obstruction > 96:
+                return None
 
     return {
         "origin": {"x": origin_x, "y": surface_mode, "z": origin_z},
         "bbox": {"x1": g.build_bbox[0], "y1": g.build_bbox[1], "z1": g.build_bbox[2], "x2": g.build_bbox[3], "y2": g.build_bbox[4], "z2": g.build_bbox[5]},
         "chunk_box": {"x1": g.chunk_box[0], "z1": g.chunk_box[1], "x2": g.chunk_box[2], "z2": g.chunk_box[3]},
         "metrics": {
-            "surface_min_y": min(heights),
-            "surface_max_y": max(heights),
+            "surface_min_y": surface_min,
+            "surface_max_y": surface_max,
             "surface_avg_y": round(sum(heights) / len(heights), 2),
             "surface_mode_y": surface_mode,
             "obstruction_weight": round(obstruction, 2),
@@ -122,21 +170,43 @@ def select_site(
     step: int,
     floors: int,
     preferred_radius: Optional[int] = None,
+    workers: int = 1,
 ) -> Dict[str, object]:
     spawn_x, _spawn_y, spawn_z = spawn
-    attempts = 0
-    for x, z in candidate_origins(
+    # Lazy: a site is usually found in the first rings, so later rings are never sorted.
+    candidates = iter_candidate_origins(
         spawn_x,
         spawn_z,
         min_distance=min_distance,
         max_distance=max_distance,
         step=step,
         preferred_radius=preferred_radius,
-    ):
-        attempts += 1
-        site = evaluate_site(world, x, z, floors=floors)
-        if site is not None:
-            return {"spawn": {"x": spawn[0], "y": spawn[1], "z": spawn[2]}, "site": site, "attempts": attempts}
+    )
+    attempts = 0
+    if workers <= 1:
+        for x, z in candidates:
+            attempts += 1
+            site = evaluate_site(world, x, z, floors=floors)
+            if site is not None:
+                return {"spawn": {"x": spawn[0], "y": spawn[1], "z": spawn[2]}, "site": site, "attempts": attempts}
+        raise RuntimeError("no valid hostile mob tower site found")
+
+    # Evaluate a window of candidates concurrently (chunk reads overlap), then take
+    # the first valid one in preference order so the result matches the serial scan.
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(islice(candidates, window))
+            if not batch:
+                break
+            futures = [pool.submit(evaluate_site, world, x, z, floors=floors) for x, z in batch]
+            for future in futures:
+                attempts += 1
+                site = future.result()
+                if site is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    return {"spawn": {"x": spawn[0], "y": spawn[1], "z": spawn[2]}, "site": site, "attempts": attempts}
     raise RuntimeError("no valid hostile mob tower site found")
 
 
@@ -148,6 +218,7 @@ def main(argv: List[str]) -> int:
     ap.add_argument("--step", type=int, default=32)
     ap.add_argument("--preferred-radius", type=int, default=None)
     ap.add_argument("--floors", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=1, help="candidates evaluated concurrently")
     ap.add_argument("--json-out", default=None)
     args = ap.parse_args(argv)
 
@@ -162,6 +233,7 @@ def main(argv: List[str]) -> int:
         step=args.step,
         floors=args.floors,
         preferred_radius=args.preferred_radius,
+        workers=args.workers,
     )
     payload = json.dumps(result, indent=2, sort_keys=True)
     if args.json_out:
@@ -4,8 +4,12 @@
 from __future__ import annotations
 
 import math
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple
+from functools import lru_cache
+from itertools import chain, product
+from types import MappingProxyType
+from typing import DefaultDict, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Set, Tuple
 
 
 M_FOUND = "minecraft:cobblestone"
@@ -27,8 +31,10 @@ FLOOR_SPACING = 5
 FLOOR_CEILING_OFFSET = 4
 
 
-@dataclass(frozen=True)
-class Op:
+# Op is a NamedTuple rather than a frozen dataclass: build_operations creates
+# tens of them per floor and tuple construction is ~4x cheaper. Corners are
+# normalized on construction (x1 <= x2, y1 <= y2, z1 <= z2).
+class Op(NamedTuple):
     kind: str
     x1: int
     y1: int
@@ -40,6 +46,18 @@ class Op:
     category: str
     critical: bool = False
 
+    @property
+    def xs(self) -> range:
+        return range(self.x1, self.x2 + 1)
+
+    @property
+    def ys(self) -> range:
+        return range(self.y1, self.y2 + 1)
+
+    @property
+    def zs(self) -> range:
+        return range(self.z1, self.z2 + 1)
+
 
 @dataclass(frozen=True)
 class Geometry:
@@ -64,68 +82,86 @@ class Geometry:
     chunk_box: Tuple[int, int, int, int]
 
 
-def geometry(origin: Tuple[int, int, int], floors: int) -> Geometry:
-    x0, y0, z0 = origin
-    first_floor_y = y0 + 22
-    top_y = first_floor_y + (floors - 1) * FLOOR_SPACING + FLOOR_CEILING_OFFSET
-    roof_y = top_y + 1
+class _GeometryBase(NamedTuple):
+    """Floors-independent part of Geometry: footprint, kill room, ladder."""
+
+    first_floor_y: int
+    outer_x1: int
+    outer_x2: int
+    outer_z1: int
+    outer_z2: int
+    room_x1: int
+    room_x2: int
+    room_z1: int
+    room_z2: int
+    ladder_x: int
+    ladder_z: int
+    select_bbox: Tuple[int, int, int, int]
+    chunk_box: Tuple[int, int, int, int]
 
+
+@lru_cache(maxsize=128)
+def _geometry_base(origin: Tuple[int, int, int]) -> _GeometryBase:
+    x0, y0, z0 = origin
     outer_x1 = x0 - 8
     outer_x2 = x0 + 9
     outer_z1 = z0 - 8
     outer_z2 = z0 + 9
 
-    room_x1 = x0 - 3
-    room_x2 = x0 + 4
-    room_z1 = z0 + 3
-    room_z2 = z0 + 7
-
     ladder_x = outer_x1 - 1
     ladder_z = z0
 
     build_x1 = ladder_x
     build_x2 = outer_x2
-    build_y1 = y0
-    build_y2 = roof_y + 1
     build_z1 = outer_z1
     build_z2 = outer_z2
 
-    clear_x1 = outer_x1 - 2
-    clear_x2 = outer_x2 + 2
-    clear_y1 = y0 + 1
-    clear_y2 = top_y + 2
-    clear_z1 = outer_z1 - 2
-    clear_z2 = outer_z2 + 2
-
-    select_x1 = build_x1 - 2
-    select_x2 = build_x2 + 2
-    select_z1 = build_z1 - 2
-    select_z2 = build_z2 + 2
-
-    return Geometry(
-        origin=origin,
-        floors=floors,
-        first_floor_y=first_floor_y,
-        top_y=top_y,
-        roof_y=roof_y,
+    return _GeometryBase(
+        first_floor_y=y0 + 22,
         outer_x1=outer_x1,
         outer_x2=outer_x2,
         outer_z1=outer_z1,
         outer_z2=outer_z2,
-        room_x1=room_x1,
-        room_x2=room_x2,
-        room_z1=room_z1,
-        room_z2=room_z2,
+        room_x1=x0 - 3,
+        room_x2=x0 + 4,
+        room_z1=z0 + 3,
+        room_z2=z0 + 7,
         ladder_x=ladder_x,
         ladder_z=ladder_z,
-        build_bbox=(build_x1, build_y1, build_z1, build_x2, build_y2, build_z2),
-        select_bbox=(select_x1, select_z1, select_x2, select_z2),
-        clear_bbox=(clear_x1, clear_y1, clear_z1, clear_x2, clear_y2, clear_z2),
+        select_bbox=(build_x1 - 2, build_z1 - 2, build_x2 + 2, build_z2 + 2),
         chunk_box=(build_x1 >> 4, build_z1 >> 4, build_x2 >> 4, build_z2 >> 4),
     )
 
 
+# The helpers below are pure functions of (origin, floors) and call each other
+# heavily (expected_blocks -> build_operations -> stopper_blocks...), so their
+# results are memoized and handed out as read-only views.
+@lru_cache(maxsize=128)
+def geometry(origin: Tuple[int, int, int], floors: int) -> Geometry:
+    base = _geometry_base(origin)
+    y0 = origin[1]
+    top_y = base.first_floor_y + (floors - 1) * FLOOR_SPACING + FLOOR_CEILING_OFFSET
+    roof_y = top_y + 1
+    outer_x1, outer_x2 = base.outer_x1, base.outer_x2
+    outer_z1, outer_z2 = base.outer_z1, base.outer_z2
+    return Geometry(
+        origin=origin,
+        floors=floors,
+        top_y=top_y,
+        roof_y=roof_y,
+        build_bbox=(base.ladder_x, y0, outer_z1, outer_x2, roof_y + 1, outer_z2),
+        clear_bbox=(outer_x1 - 2, y0 + 1, outer_z1 - 2, outer_x2 + 2, top_y + 2, outer_z2 + 2),
+        **base._asdict(),
+    )
+
+
 def _fill(ops: List[Op], x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, block: str, category: str, critical: bool = False) -> None:
+    if x1 > x2:
+        x1, x2 = x2, x1
+    if y1 > y2:
+        y1, y2 = y2, y1
+    if z1 > z2:
+        z1, z2 = z2, z1
     ops.append(Op("fill", x1, y1, z1, x2, y2, z2, block, category, critical))
 
 
@@ -137,13 +173,8 @@ def _range(a: int, b: int) -> range:
     return range(min(a, b), max(a, b) + 1)
 
 
-def _expand(op: Op) -> List[Tuple[int, int, int]]:
-    pts: List[Tuple[int, int, int]] = []
-    for x in _range(op.x1, op.x2):
-        for y in _range(op.y1, op.y2):
-            for z in _range(op.z1, op.z2):
-                pts.append((x, y, z))
-    return pts
+def _expand(op: Op) -> Iterator[Tuple[int, int, int]]:
+    return product(op.xs, op.ys, op.zs)
 
 
 def _quadrant_pad_ranges(g: Geometry, x0: int, z0: int) -> List[Tuple[int, int, int, int]]:
@@ -155,7 +186,8 @@ def _quadrant_pad_ranges(g: Geometry, x0: int, z0: int) -> List[Tuple[int, int,
     ]
 
 
-def stopper_blocks(origin: Tuple[int, int, int], floors: int) -> Dict[Tuple[int, int, int], str]:
+@lru_cache(maxsize=16)
+def stopper_blocks(origin: Tuple[int, int, int], floors: int) -> Mapping[Tuple[int, int, int], str]:
     g = geometry(origin, floors)
     x0, _y0, z0 = origin
     pts: Dict[Tuple[int, int, int], str] = {}
@@ -175,51 +207,64 @@ def stopper_blocks(origin: Tuple[int, int, int], floors: int) -> Dict[Tuple[int,
             (x0 + 1, pad_y, z0 + 2),
         ):
             pts[pt] = M_GATE_EW
-    return pts
+    return MappingProxyType(pts)
 
 
-def water_source_positions(origin: Tuple[int, int, int], floors: int) -> Set[Tuple[int, int, int]]:
+@lru_cache(maxsize=16)
+def _water_sources(origin: Tuple[int, int, int], floors: int) -> Tuple[Tuple[int, int, int], ...]:
+    # Floor by floor, in a fixed order, so build_operations is deterministic
+    # without sorting.
     g = geometry(origin, floors)
     x0, _y0, z0 = origin
-    pts: Set[Tuple[int, int, int]] = set()
+    pts: List[Tuple[int, int, int]] = []
     for floor_idx in range(floors):
         pad_y = g.first_floor_y + floor_idx * FLOOR_SPACING + 1
-        for pt in (
-            (x0, pad_y, z0 - 7),
-            (x0 + 1, pad_y, z0 - 7),
-            (x0, pad_y, z0 + 8),
-            (x0 + 1, pad_y, z0 + 8),
-            (x0 - 7, pad_y, z0),
-            (x0 - 7, pad_y, z0 + 1),
-            (x0 + 8, pad_y, z0),
-            (x0 + 8, pad_y, z0 + 1),
-        ):
-            pts.add(pt)
-    return pts
+        pts.extend(
+            (
+                (x0, pad_y, z0 - 7),
+                (x0 + 1, pad_y, z0 - 7),
+                (x0, pad_y, z0 + 8),
+                (x0 + 1, pad_y, z0 + 8),
+                (x0 - 7, pad_y, z0),
+                (x0 - 7, pad_y, z0 + 1),
+                (x0 + 8, pad_y, z0),
+                (x0 + 8, pad_y, z0 + 1),
+            )
+        )
+    return tuple(pts)
+
+
+@lru_cache(maxsize=16)
+def water_source_positions(origin: Tuple[int, int, int], floors: int) -> FrozenSet[Tuple[int, int, int]]:
+    return frozenset(_water_sources(origin, floors))
 
 
-def water_channel_positions(origin: Tuple[int, int, int], floors: int) -> Set[Tuple[int, int, int]]:
+@lru_cache(maxsize=16)
+def water_channel_ops(origin: Tuple[int, int, int], floors: int) -> Tuple[Op, ...]:
+    """The four straight water runs per floor, as fills.
+
+    These describe where water ends up once the sources flow; they are not part
+    of build_operations, which only places the sources.
+    """
     g = geometry(origin, floors)
     x0, _y0, z0 = origin
-    out: Set[Tuple[int, int, int]] = set()
+    ops: List[Op] = []
     for floor_idx in range(floors):
         pad_y = g.first_floor_y + floor_idx * FLOOR_SPACING + 1
-        for z in _range(g.outer_z1 + 1, z0 - 2):
-            out.add((x0, pad_y, z))
-            out.add((x0 + 1, pad_y, z))
-        for z in _range(z0 + 3, g.outer_z2 - 1):
-            out.add((x0, pad_y, z))
-            out.add((x0 + 1, pad_y, z))
-        for x in _range(g.outer_x1 + 1, x0 - 2):
-            out.add((x, pad_y, z0))
-            out.add((x, pad_y, z0 + 1))
-        for x in _range(x0 + 3, g.outer_x2 - 1):
-            out.add((x, pad_y, z0))
-            out.add((x, pad_y, z0 + 1))
-    return out
-
-
-def build_operations(origin: Tuple[int, int, int], floors: int, *, include_clear: bool = True) -> List[Op]:
+        _fill(ops, x0, pad_y, g.outer_z1 + 1, x0 + 1, pad_y, z0 - 2, M_WATER, "water_channel", True)
+        _fill(ops, x0, pad_y, z0 + 3, x0 + 1, pad_y, g.outer_z2 - 1, M_WATER, "water_channel", True)
+        _fill(ops, g.outer_x1 + 1, pad_y, z0, x0 - 2, pad_y, z0 + 1, M_WATER, "water_channel", True)
+        _fill(ops, x0 + 3, pad_y, z0, g.outer_x2 - 1, pad_y, z0 + 1, M_WATER, "water_channel", True)
+    return tuple(ops)
+
+
+@lru_cache(maxsize=16)
+def water_channel_positions(origin: Tuple[int, int, int], floors: int) -> FrozenSet[Tuple[int, int, int]]:
+    return frozenset(chain.from_iterable(_expand(op) for op in water_channel_ops(origin, floors)))
+
+
+@lru_cache(maxsize=16)
+def build_operations(origin: Tuple[int, int, int], floors: int, *, include_clear: bool = True) -> Tuple[Op, ...]:
     g = geometry(origin, floors)
     x0, y0, z0 = origin
     ops: List[Op] = []
@@ -252,6 +297,15 @@ def build_operations(origin: Tuple[int, int, int], floors: int, *, include_clear
     _fill(ops, g.outer_x2, y0, g.outer_z1, g.outer_x2, g.top_y, g.outer_z1, M_WALL, "support_pillars")
     _fill(ops, g.outer_x2, y0, g.outer_z2, g.outer_x2, g.top_y, g.outer_z2, M_WALL, "support_pillars")
 
+    # Group the multi-floor water/stopper layouts by pad height once, so each
+    # floor only visits its own cells. Both are built in a fixed order.
+    water_by_y: DefaultDict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+    for pt in _water_sources(origin, floors):
+        water_by_y[pt[1]].append(pt)
+    stoppers_by_y: DefaultDict[int, List[Tuple[Tuple[int, int, int], str]]] = defaultdict(list)
+    for pt, block in stopper_blocks(origin, floors).items():
+        stoppers_by_y[pt[1]].append((pt, block))
+
     for floor_idx in range(floors):
         floor_y = g.first_floor_y + floor_idx * FLOOR_SPACING
         pad_y = floor_y + 1
@@ -273,13 +327,11 @@ def build_operations(origin: Tuple[int, int, int], floors: int, *, include_clear
         _fill(ops, g.outer_x1, ceil_y, g.outer_z1, g.outer_x2, ceil_y, g.outer_z2, M_CEIL, "floor_ceiling", True)
         _fill(ops, x0, ceil_y, z0, x0 + 1, ceil_y, z0 + 1, "minecraft:air", "shaft_air")
 
-        for x, y, z in sorted(water_source_positions(origin, floors)):
-            if y == pad_y:
-                _set(ops, x, y, z, M_WATER, "water_sources", True)
+        for x, y, z in water_by_y[pad_y]:
+            _set(ops, x, y, z, M_WATER, "water_sources", True)
 
-        for (x, y, z), block in sorted(stopper_blocks(origin, floors).items()):
-            if y == pad_y:
-                _set(ops, x, y, z, block, "water_stops", True)
+        for (x, y, z), block in stoppers_by_y[pad_y]:
+            _set(ops, x, y, z, block, "water_stops", True)
 
         carpet_y = pad_y + 1
         for x in (x0 - 6, x0 - 3, x0 + 3, x0 + 6):
@@ -297,84 +349,100 @@ def build_operations(origin: Tuple[int, int, int], floors: int, *, include_clear
     for y in _range(y0 + 1, g.roof_y):
         _set(ops, g.ladder_x, y, g.ladder_z, M_LADDER, "ladder", True)
 
-    return ops
+    return tuple(ops)
+
+
+def _paint(
+    blocks: Dict[Tuple[int, int, int], str],
+    ops: Iterable[Op],
+    critical: Optional[Dict[Tuple[int, int, int], str]] = None,
+) -> None:
+    # Apply ops in order as whole regions: air ops carve with a pre-bound pop,
+    # solid ops land in one dict.update instead of a store per cell. Critical
+    # solids are also recorded in `critical` (never carved), reusing the same
+    # expanded region.
+    carve = blocks.pop
+    update = blocks.update
+    fromkeys = dict.fromkeys
+    for _kind, x1, y1, z1, x2, y2, z2, block, _category, is_critical in ops:
+        cells = product(range(x1, x2 + 1), range(y1, y2 + 1), range(z1, z2 + 1))
+        if block == "minecraft:air":
+            for pt in cells:
+                carve(pt, None)
+            continue
+        region = fromkeys(cells, block)
+        update(region)
+        if is_critical and critical is not None:
+            critical.update(region)
 
 
-def expected_blocks(origin: Tuple[int, int, int], floors: int) -> Dict[Tuple[int, int, int], str]:
+@lru_cache(maxsize=16)
+def _compiled_tower(
+    origin: Tuple[int, int, int], floors: int
+) -> Tuple[Mapping[Tuple[int, int, int], str], Mapping[Tuple[int, int, int], str]]:
+    """(expected_blocks, critical_block_expectations) from a single pass over the ops.
+
+    Process-local cache; call _compiled_tower.cache_clear() to drop it.
+    """
     blocks: Dict[Tuple[int, int, int], str] = {}
-    for op in build_operations(origin, floors, include_clear=False):
-        if op.block == "minecraft:air":
-            for pt in _expand(op):
-                blocks.pop(pt, None)
-            continue
-        for pt in _expand(op):
-            blocks[pt] = op.block
-    for pt in water_channel_positions(origin, floors):
-        blocks[pt] = M_WATER
-    return blocks
+    critical: Dict[Tuple[int, int, int], str] = {}
+    _paint(blocks, build_operations(origin, floors, include_clear=False), critical)
+    _paint(blocks, water_channel_ops(origin, floors), critical)
+    return MappingProxyType(blocks), MappingProxyType(critical)
 
 
-def cleanup_operations(origin: Tuple[int, int, int], floors: int) -> List[Op]:
-    out: List[Op] = []
+def expected_blocks(origin: Tuple[int, int, int], floors: int) -> Mapping[Tuple[int, int, int], str]:
+    return _compiled_tower(origin, floors)[0]
+
+
+def cleanup_operations(origin: Tuple[int, int, int], floors: int) -> Iterator[Op]:
+    # One op per expected block: yielded lazily so callers can stream them.
     for (x, y, z), block in expected_blocks(origin, floors).items():
-        out.append(Op("fill", x, y, z, x, y, z, block, "cleanup"))
-    return out
+        yield Op("fill", x, y, z, x, y, z, block, "cleanup")
 
 
-def critical_block_expectations(origin: Tuple[int, int, int], floors: int) -> Dict[Tuple[int, int, int], str]:
-    blocks: Dict[Tuple[int, int, int], str] = {}
-    for op in build_operations(origin, floors, include_clear=False):
-        if not op.critical or op.block == "minecraft:air":
-            continue
-        for pt in _expand(op):
-            blocks[pt] = op.block
-    for pt in water_channel_positions(origin, floors):
-        blocks[pt] = M_WATER
-    return blocks
+def critical_block_expectations(origin: Tuple[int, int, int], floors: int) -> Mapping[Tuple[int, int, int], str]:
+    return _compiled_tower(origin, floors)[1]
 
 
-def critical_air_positions(origin: Tuple[int, int, int], floors: int) -> Set[Tuple[int, int, int]]:
+@lru_cache(maxsize=16)
+def critical_air_positions(origin: Tuple[int, int, int], floors: int) -> FrozenSet[Tuple[int, int, int]]:
     g = geometry(origin, floors)
     x0, y0, z0 = origin
     cells: Set[Tuple[int, int, int]] = set()
 
-    for y in _range(y0 + 1, g.top_y):
-        for x in (x0, x0 + 1):
-            for z in (z0, z0 + 1):
-                cells.add((x, y, z))
+    cells.update(product((x0, x0 + 1), _range(y0 + 1, g.top_y), (z0, z0 + 1)))
+    cells.update(product(_range(g.room_x1 + 1, g.room_x2 - 1), _range(y0 + 1, y0 + 2), _range(g.room_z1, g.room_z2 - 1)))
+    cells.update(product((x0,), _range(y0 + 1, y0 + 2), (g.room_z2,)))
+    cells.update(product((g.ladder_x,), _range(y0 + 1, g.roof_y), (g.ladder_z,)))
 
-    for x in _range(g.room_x1 + 1, g.room_x2 - 1):
-        for y in _range(y0 + 1, y0 + 2):
-            for z in _range(g.room_z1, g.room_z2 - 1):
-                cells.add((x, y, z))
+    return frozenset(cells)
 
-    for y in _range(y0 + 1, y0 + 2):
-        cells.add((x0, y, g.room_z2))
 
-    for y in _range(y0 + 1, g.roof_y):
-        cells.add((g.ladder_x, y, g.ladder_z))
-
-    return cells
-
-
-def planned_spawn_positions(origin: Tuple[int, int, int], floors: int) -> Set[Tuple[int, int, int]]:
+@lru_cache(maxsize=16)
+def planned_spawn_positions(origin: Tuple[int, int, int], floors: int) -> FrozenSet[Tuple[int, int, int]]:
     g = geometry(origin, floors)
     blocks = expected_blocks(origin, floors)
+    # The pad footprint is the same on every floor: enumerate its (x, z)
+    # columns once and test each floor's three layers with one comprehension.
+    pad_columns = tuple(
+        chain.from_iterable(
+            product(_range(x1, x2), _range(z1, z2)) for x1, x2, z1, z2 in _quadrant_pad_ranges(g, origin[0], origin[2])
+        )
+    )
+    get = blocks.get
     out: Set[Tuple[int, int, int]] = set()
     for floor_idx in range(floors):
-        floor_y = g.first_floor_y + floor_idx * FLOOR_SPACING
-        pad_y = floor_y + 1
-        for x1, x2, z1, z2 in _quadrant_pad_ranges(g, origin[0], origin[2]):
-            for x in _range(x1, x2):
-                for z in _range(z1, z2):
-                    if blocks.get((x, pad_y, z)) != M_FLOOR:
-                        continue
-                    if blocks.get((x, pad_y + 1, z), "minecraft:air") != "minecraft:air":
-                        continue
-                    if blocks.get((x, pad_y + 2, z), "minecraft:air") != "minecraft:air":
-                        continue
-                    out.add((x, pad_y + 1, z))
-    return out
+        pad_y = g.first_floor_y + floor_idx * FLOOR_SPACING + 1
+        spawn_y = pad_y + 1
+        head_y = pad_y + 2
+        # expected_blocks never stores air, so membership means "not air".
+        out.update(
+            (x, spawn_y, z)
+            for x, z in pad_columns
+            if get((x, pad_y, z)) == M_FLOOR and (x, spawn_y, z) not in blocks and (x, head_y, z) not in blocks
+        )
+    return frozenset(out)
 
 
 def spawn_distance_metrics(
@@ -1,25 +1,34 @@
 import argparse
+import contextlib
+import functools
+import io
+import itertools
 import json
 import os
 import re
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+TELLRAW_RE = re.compile(r"^(\s*tellraw\s+\S+\s+)(.+)$")
 
+
+_SKIP_PREFIXES = ("cobblemon:", "minecraft:", "johto:", "/", "#")
+_SKIP_LITERALS = frozenset({"", "true", "false", "null"})
+_ENUM_RE = re.compile(r"[A-Za-z0-9_\-.:/]+")
+
+
+@functools.lru_cache(maxsize=100000)
 def should_translate_string(s: str) -> bool:
     if not s:
         return False
-    # Avoid translating obvious IDs/keys.
-    if s.startswith("cobblemon:") or s.startswith("minecraft:") or s.startswith("johto:"):
-        return False
-    if s.startswith("q.") or "q." in s:
+    # Avoid translating obvious IDs/keys (namespaced ids, commands, tags, q. expressions).
+    if s.startswith(_SKIP_PREFIXES) or "q." in s:
         return False
-    if s.startswith("/") or s.startswith("#"):
-        return False
-    if s.strip() in {"", "true", "false", "null"}:
+    if s.strip() in _SKIP_LITERALS:
         return False
     # Keep short tokens like enum values.
-    if re.fullmatch(r"[A-Za-z0-9_\-.:/]+", s) and len(s) <= 24:
+    if len(s) <= 24 and _ENUM_RE.fullmatch(s):
         return False
     return True
 
@@ -30,12 +39,57 @@ def load_overrides(path: Path) -> dict:
     return json.loads(path.read_text(encoding="utf-8", errors="ignore"))
 
 
-def make_translator():
+def compile_overrides(overrides: dict):
+    # One alternation over all sources, longest first so that an override
+    # wins over any shorter override it contains.
+    if not overrides:
+        return None
+    pattern = re.compile("|".join(re.escape(src) for src in sorted(overrides, key=len, reverse=True) if src))
+    return lambda s: pattern.sub(lambda m: overrides[m.group(0)], s)
+
+
+def apply_overrides(obj, sub):
+    if isinstance(obj, str):
+        return sub(obj)
+    if isinstance(obj, list):
+        return [apply_overrides(x, sub) for x in obj]
+    if isinstance(obj, dict):
+        return {k: apply_overrides(v, sub) for k, v in obj.items()}
+    return obj
+
+
+def load_translation_cache(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_translation_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=True, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def make_translator(cache: dict | None = None):
     # Import argostranslate lazily; fail fast if not installed.
     from argostranslate import translate
 
+    # Dialogues repeat a lot of lines ("Yes", greetings, menu options): each
+    # distinct source string goes through the model once, and the memo can be
+    # persisted between runs.
+    memo = cache if cache is not None else {}
+
     def t(s: str) -> str:
-        return translate.translate(s, "en", "fr")
+        out = memo.get(s)
+        if out is None:
+            out = translate.translate(s, "en", "fr")
+            memo[s] = out
+        return out
 
     return t
 
@@ -65,6 +119,36 @@ def translate_obj(obj, translate_fn):
     return obj
 
 
+# Per-process state for dialogue translation; filled by _init_dialogue_worker
+# either in the main process (--workers 1) or once per pool worker.
+_DIALOGUE_STATE: dict = {}
+
+
+def _init_dialogue_worker(johto_zip: str, overrides: dict, cache: dict) -> None:
+    _DIALOGUE_STATE["zip"] = zipfile.ZipFile(johto_zip)
+    _DIALOGUE_STATE["override_sub"] = compile_overrides(overrides)
+    _DIALOGUE_STATE["cache"] = cache
+    _DIALOGUE_STATE["translate_fn"] = make_translator(cache)
+
+
+def _translate_dialogue(n: str):
+    """Translate one dialogue entry; returns (name, rendered json or None, new cache entries)."""
+    cache = _DIALOGUE_STATE["cache"]
+    known = len(cache)
+    try:
+        with io.TextIOWrapper(_DIALOGUE_STATE["zip"].open(n), encoding="utf-8", errors="ignore") as fh:
+            data = json.load(fh)
+    except Exception:
+        return n, None, {}
+    data2 = translate_obj(data, _DIALOGUE_STATE["translate_fn"])
+    # Apply manual overrides (exact string match) after translation.
+    override_sub = _DIALOGUE_STATE["override_sub"]
+    if override_sub:
+        data2 = apply_overrides(data2, override_sub)
+    fresh = dict(itertools.islice(cache.items(), known, None))
+    return n, json.dumps(data2, ensure_ascii=True, indent=2) + "\n", fresh
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--johto-zip", required=True)
@@ -72,16 +156,20 @@ def main():
     ap.add_argument("--overrides-json", default="")
     ap.add_argument("--include-mcfunction-tellraw", action="store_true")
     ap.add_argument("--johto-fixes-dir", default="")
+    ap.add_argument("--translation-cache", default="", help="JSON file memoizing en->fr translations across runs")
+    ap.add_argument("--workers", type=int, default=1, help="processes translating dialogue files in parallel")
     args = ap.parse_args()
 
     johto_zip = Path(args.johto_zip).resolve()
     out_dir = Path(args.out_dir).resolve()
     overrides_path = Path(args.overrides_json).resolve() if args.overrides_json else None
     fixes_dir = Path(args.johto_fixes_dir).resolve() if args.johto_fixes_dir else None
+    cache_path = Path(args.translation_cache).resolve() if args.translation_cache else None
 
     overrides = load_overrides(overrides_path) if overrides_path else {}
 
-    translate_fn = make_translator()
+    cache = load_translation_cache(cache_path) if cache_path else {}
+    translate_fn = make_translator(cache)
 
     out_dir.mkdir(parents=True, exist_ok=True)
     (out_dir / "pack.mcmeta").write_text(
@@ -106,24 +194,31 @@ def main():
     dialogue_files = [n for n in z.namelist() if n.startswith(dlg_prefix) and n.endswith(".json")]
 
     translated_count = 0
-    for n in dialogue_files:
-        raw = z.read(n).decode("utf-8", "ignore")
-        try:
-            data = json.loads(raw)
-        except Exception:
-            continue
-        data2 = translate_obj(data, translate_fn)
-        # Apply manual overrides (exact string match) after translation.
-        if overrides:
-            data2s = json.dumps(data2, ensure_ascii=True)
-            for src, dst in overrides.items():
-                data2s = data2s.replace(src, dst)
-            data2 = json.loads(data2s)
-
-        out_path = out_dir / n
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(json.dumps(data2, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
-        translated_count += 1
+    workers = max(1, args.workers)
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            # Every worker loads its own argos model and starts from the cache
+            # as it was on entry; new translations come back with each result.
+            pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_dialogue_worker,
+                    initargs=(str(johto_zip), overrides, cache),
+                )
+            )
+            results = pool.map(_translate_dialogue, dialogue_files, chunksize=8)
+        else:
+            _init_dialogue_worker(str(johto_zip), overrides, cache)
+            results = map(_translate_dialogue, dialogue_files)
+
+        for n, text, fresh in results:
+            cache.update(fresh)
+            if text is None:
+                continue
+            out_path = out_dir / n
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            out_path.write_text(text, encoding="utf-8")
+            translated_count += 1
 
     print(f"dialogues_translated={translated_count}")
 
@@ -131,7 +226,6 @@ def main():
     if args.include_mcfunction_tellraw:
         func_prefix = "data/johto/function/"
         func_files = [n for n in z.namelist() if n.startswith(func_prefix) and n.endswith(".mcfunction")]
-        tellraw_re = re.compile(r"^(\\s*tellraw\\s+\\S+\\s+)(.+)$")
 
         def translate_tellraw_json(s: str) -> str:
             try:
@@ -144,27 +238,26 @@ def main():
         w = 0
         for n in func_files:
             # If a fixed version exists, use it as base (avoid reintroducing removed commands).
-            if fixes_dir:
-                alt = fixes_dir / n
-                if alt.exists():
-                    base = alt.read_text(encoding="utf-8", errors="ignore")
-                else:
-                    base = z.read(n).decode("utf-8", "ignore")
+            alt = fixes_dir / n if fixes_dir else None
+            if alt is not None and alt.exists():
+                base = alt.open(encoding="utf-8", errors="ignore")
             else:
-                base = z.read(n).decode("utf-8", "ignore")
+                base = io.TextIOWrapper(z.open(n), encoding="utf-8", errors="ignore")
 
             lines = []
             changed = False
-            for ln in base.splitlines():
-                m = tellraw_re.match(ln)
-                if not m:
-                    lines.append(ln)
-                    continue
-                prefix, j = m.group(1), m.group(2)
-                j2 = translate_tellraw_json(j)
-                if j2 != j:
-                    changed = True
-                lines.append(prefix + j2)
+            with base:
+                for ln in base:
+                    ln = ln.rstrip("\r\n")
+                    m = TELLRAW_RE.match(ln)
+                    if not m:
+                        lines.append(ln)
+                        continue
+                    prefix, j = m.group(1), m.group(2)
+                    j2 = translate_tellraw_json(j)
+                    if j2 != j:
+                        changed = True
+                    lines.append(prefix + j2)
             if changed:
                 out_path = out_dir / n
                 out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -172,6 +265,10 @@ def main():
                 w += 1
         print(f"mcfunctions_with_tellraw_translated={w}")
 
+    if cache_path:
+        save_translation_cache(cache_path, cache)
+        print(f"translation_cache_entries={len(cache)}")
+
 
 if __name__ == "__main__":
     main()
@@ -17,6 +17,8 @@ set -euo pipefail
 #   JOHTO_FRPACK_DIR=/data/world/datapacks/JohtoFR
 #   JOHTO_RELOAD=true|false (default true)
 #   JOHTO_FR_INCLUDE_TELLRAW=true|false (default false)
+#   JOHTO_FR_TRANSLATION_CACHE=./downloads/argos/translations.cache.json
+#   JOHTO_FR_WORKERS=1 (dialogue translation processes; each loads its own model)
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPO_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
@@ -27,6 +29,8 @@ JOHTO_FRPACK_DIR="${JOHTO_FRPACK_DIR:-./data/world/datapacks/JohtoFR}"
 JOHTO_RELOAD="${JOHTO_RELOAD:-true}"
 JOHTO_FR_INCLUDE_TELLRAW="${JOHTO_FR_INCLUDE_TELLRAW:-false}"
 JOHTO_DOCKER_IMAGE="${JOHTO_DOCKER_IMAGE:-python:3.12}"
+JOHTO_FR_TRANSLATION_CACHE="${JOHTO_FR_TRANSLATION_CACHE:-./downloads/argos/translations.cache.json}"
+JOHTO_FR_WORKERS="${JOHTO_FR_WORKERS:-1}"
 
 if [[ ! -f "${JOHTO_ZIP}" ]]; then
   echo "Missing Johto datapack zip: ${JOHTO_ZIP}" >&2
@@ -38,7 +42,7 @@ mkdir -p "${JOHTO_FRPACK_DIR}"
 
 ./infra/johto-fr-install.sh
 
-args=(--johto-zip "${JOHTO_ZIP}" --out-dir "${JOHTO_FRPACK_DIR}" --johto-fixes-dir "./data/world/datapacks/JohtoFixes")
+args=(--johto-zip "${JOHTO_ZIP}" --out-dir "${JOHTO_FRPACK_DIR}" --johto-fixes-dir "./data/world/datapacks/JohtoFixes" --translation-cache "${JOHTO_FR_TRANSLATION_CACHE}" --workers "${JOHTO_FR_WORKERS}")
 if [[ "${JOHTO_FR_INCLUDE_TELLRAW}" == "true" ]]; then
   args+=(--include-mcfunction-tellraw)
 fi
@@ -14,8 +14,11 @@ Optional:
 from __future__ import annotations
 
 import argparse
+import array
 import datetime as dt
+import functools
 import gzip
+import io
 import json
 import os
 import re
@@ -26,9 +29,33 @@ import sys
 import urllib.error
 import urllib.request
 import uuid as uuid_lib
-from collections import OrderedDict
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Set, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, TextIO, Tuple
+
+
+try:
+    # Optional ISA-L backed drop-in for gzip; noticeably faster to inflate.
+    from isal import igzip as _gzip
+    from isal.isal_zlib import error as _InflateError
+    # The default read buffer under-feeds the ISA-L decoder.
+    _gzip.READ_BUFFER_SIZE = 128 * 1024
+except ImportError:
+    _gzip = gzip
+    _InflateError = zlib.error
+
+try:
+    # Optional faster JSON decoder for usercache/stats; both accept bytes.
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+KNOWLEDGE_CAUGHT = "CAUGHT"
+KNOWLEDGE_ENCOUNTERED = "ENCOUNTERED"
 
 
 TAG_END = 0
@@ -50,6 +77,24 @@ class NBTError(Exception):
     pass
 
 
+_S_I8 = struct.Struct(">b")
+_S_I16 = struct.Struct(">h")
+_S_I32 = struct.Struct(">i")
+_S_I64 = struct.Struct(">q")
+_S_F32 = struct.Struct(">f")
+_S_F64 = struct.Struct(">d")
+
+# Fixed-width scalar tags decoded inline by _read_payload.
+_FIXED_SCALARS = {
+    TAG_BYTE: (_S_I8, 1),
+    TAG_SHORT: (_S_I16, 2),
+    TAG_INT: (_S_I32, 4),
+    TAG_LONG: (_S_I64, 8),
+    TAG_FLOAT: (_S_F32, 4),
+    TAG_DOUBLE: (_S_F64, 8),
+}
+
+
 class _Buf:
     __slots__ = ("b", "o")
 
@@ -64,20 +109,43 @@ class _Buf:
         self.o += n
         return out
 
+    # Scalar readers unpack straight from the buffer; a truncated buffer makes
+    # unpack_from raise struct.error, which load_nbt reports as NBTError.
     def read_u8(self) -> int:
-        return self.read_bytes(1)[0]
+        o = self.o
+        v = self.b[o]
+        self.o = o + 1
+        return v
 
     def read_i8(self) -> int:
-        return struct.unpack(">b", self.read_bytes(1))[0]
+        v = _S_I8.unpack_from(self.b, self.o)[0]
+        self.o += 1
+        return v
 
     def read_i16(self) -> int:
-        return struct.unpack(">h", self.read_bytes(2))[0]
+        v = _S_I16.unpack_from(self.b, self.o)[0]
+        self.o += 2
+        return v
 
     def read_i32(self) -> int:
-        return struct.unpack(">i", self.read_bytes(4))[0]
+        v = _S_I32.unpack_from(self.b, self.o)[0]
+        self.o += 4
+        return v
 
     def read_i64(self) -> int:
-        return struct.unpack(">q", self.read_bytes(8))[0]
+        v = _S_I64.unpack_from(self.b, self.o)[0]
+        self.o += 8
+        return v
+
+    def read_f32(self) -> float:
+        v = _S_F32.unpack_from(self.b, self.o)[0]
+        self.o += 4
+        return v
+
+    def read_f64(self) -> float:
+        v = _S_F64.unpack_from(self.b, self.o)[0]
+        self.o += 8
+        return v
 
     def read_string(self) -> str:
         ln = self.read_i16()
@@ -85,8 +153,16 @@ class _Buf:
             raise NBTError("negative string length")
         return self.read_bytes(ln).decode("utf-8")
 
+    def read_array(self, typecode: str, ln: int) -> List[int]:
+        # One C-level decode for the whole INT/LONG array instead of a read per element.
+        arr = array.array(typecode)
+        arr.frombytes(self.read_bytes(ln * arr.itemsize))
+        if sys.byteorder == "little":
+            arr.byteswap()
+        return arr.tolist()
 
-def _read_payload(tag: int, buf: _Buf):
+
+def _read_scalar(tag: int, buf: _Buf):
     if tag == TAG_BYTE:
         return buf.read_i8()
     if tag == TAG_SHORT:
@@ -96,9 +172,9 @@ def _read_payload(tag: int, buf: _Buf):
     if tag == TAG_LONG:
         return buf.read_i64()
     if tag == TAG_FLOAT:
-        return struct.unpack(">f", buf.read_bytes(4))[0]
+        return buf.read_f32()
     if tag == TAG_DOUBLE:
-        return struct.unpack(">d", buf.read_bytes(8))[0]
+        return buf.read_f64()
     if tag == TAG_BYTE_ARRAY:
         ln = buf.read_i32()
         if ln < 0:
@@ -106,64 +182,154 @@ def _read_payload(tag: int, buf: _Buf):
         return list(buf.read_bytes(ln))
     if tag == TAG_STRING:
         return buf.read_string()
-    if tag == TAG_LIST:
-        inner = buf.read_u8()
-        ln = buf.read_i32()
-        if ln < 0:
-            raise NBTError("negative list length")
-        return [_read_payload(inner, buf) for _ in range(ln)]
-    if tag == TAG_COMPOUND:
-        out: MutableMapping[str, object] = OrderedDict()
-        while True:
-            inner = buf.read_u8()
-            if inner == TAG_END:
-                return out
-            name = buf.read_string()
-            out[name] = _read_payload(inner, buf)
     if tag == TAG_INT_ARRAY:
         ln = buf.read_i32()
         if ln < 0:
             raise NBTError("negative int array length")
-        return [buf.read_i32() for _ in range(ln)]
+        return buf.read_array("i", ln)
     if tag == TAG_LONG_ARRAY:
         ln = buf.read_i32()
         if ln < 0:
             raise NBTError("negative long array length")
-        return [buf.read_i64() for _ in range(ln)]
+        return buf.read_array("q", ln)
     raise NBTError(f"unknown tag {tag}")
 
 
+def _open_container(tag: int, buf: _Buf) -> list:
+    # Stack frame for a container: [dict] for a compound, or
+    # [list, inner_tag, remaining] for a list.
+    if tag == TAG_COMPOUND:
+        return [{}]
+    inner = buf.read_u8()
+    ln = buf.read_i32()
+    if ln < 0:
+        raise NBTError("negative list length")
+    return [[], inner, ln]
+
+
+def _read_payload(tag: int, buf: _Buf):
+    if tag != TAG_COMPOUND and tag != TAG_LIST:
+        return _read_scalar(tag, buf)
+    # Nested compounds/lists are walked with an explicit stack instead of one
+    # Python frame per container (pokedex files nest species > forms > fields).
+    # Field names and short string values repeat across thousands of records
+    # ("formRecords", "knowledge", "CAUGHT"...): decode each distinct encoding once.
+    b = buf.b
+    size_b = len(b)
+    strings: Dict[bytes, str] = {}
+    root = _open_container(tag, buf)
+    stack = [root]
+    while stack:
+        frame = stack[-1]
+        obj = frame[0]
+        if len(frame) == 1:
+            o = buf.o
+            inner = b[o]
+            if inner == TAG_END:
+                buf.o = o + 1
+                stack.pop()
+                continue
+            ln = _S_I16.unpack_from(b, o + 1)[0]
+            o += 3
+            end = o + ln
+            if ln < 0 or end > size_b:
+                raise NBTError("negative string length" if ln < 0 else "unexpected EOF")
+            raw = b[o:end]
+            name = strings.get(raw)
+            if name is None:
+                name = strings[raw] = raw.decode("utf-8")
+            buf.o = end
+            fixed = _FIXED_SCALARS.get(inner)
+            if inner == TAG_STRING:
+                ln = _S_I16.unpack_from(b, end)[0]
+                o = end + 2
+                end = o + ln
+                if ln < 0 or end > size_b:
+                    raise NBTError("negative string length" if ln < 0 else "unexpected EOF")
+                raw = b[o:end]
+                value = strings.get(raw)
+                if value is None:
+                    value = strings[raw] = raw.decode("utf-8")
+                obj[name] = value
+                buf.o = end
+            elif fixed is not None:
+                st, size = fixed
+                obj[name] = st.unpack_from(buf.b, buf.o)[0]
+                buf.o += size
+            elif inner == TAG_COMPOUND or inner == TAG_LIST:
+                child = _open_container(inner, buf)
+                obj[name] = child[0]
+                stack.append(child)
+            else:
+                obj[name] = _read_scalar(inner, buf)
+            continue
+        inner, remaining = frame[1], frame[2]
+        if remaining == 0:
+            stack.pop()
+        elif inner == TAG_COMPOUND or inner == TAG_LIST:
+            frame[2] = remaining - 1
+            child = _open_container(inner, buf)
+            obj.append(child[0])
+            stack.append(child)
+        else:
+            obj.extend([_read_scalar(inner, buf) for _ in range(remaining)])
+            stack.pop()
+    return root[0]
+
+
 def load_nbt(path: Path) -> Mapping[str, object]:
-    raw = path.read_bytes()
-    try:
-        raw = gzip.decompress(raw)
-    except OSError:
-        pass
+    # Inflate straight from the file: the compressed bytes are never held in
+    # memory as a whole next to the decompressed buffer.
+    with path.open("rb") as fh:
+        magic = fh.read(2)
+        fh.seek(0)
+        if magic == GZIP_MAGIC:
+            try:
+                with _gzip.open(fh, "rb") as gz:
+                    raw = gz.read()
+            except EOFError as exc:
+                raise NBTError(f"truncated gzip stream: {path}") from exc
+            except (OSError, _InflateError) as exc:
+                # BadGzipFile is an OSError; bad deflate data raises the inflater's error.
+                raise NBTError(f"corrupt gzip stream: {path}: {exc}") from exc
+        else:
+            raw = fh.read()
     buf = _Buf(raw)
-    root_tag = buf.read_u8()
-    if root_tag != TAG_COMPOUND:
-        raise NBTError(f"unexpected root tag {root_tag}")
-    _ = buf.read_string()
-    out = _read_payload(root_tag, buf)
+    try:
+        root_tag = buf.read_u8()
+        if root_tag != TAG_COMPOUND:
+            raise NBTError(f"unexpected root tag {root_tag}")
+        _ = buf.read_string()
+        out = _read_payload(root_tag, buf)
+    except (IndexError, struct.error) as exc:
+        raise NBTError("unexpected EOF") from exc
     if not isinstance(out, Mapping):
         raise NBTError("root payload is not a compound")
     return out
 
 
-def parse_showdown_species_ids(path: Path) -> List[str]:
-    text = path.read_text(encoding="utf-8")
-    anchor = "const Pokedex = {"
-    if anchor not in text:
-        raise ValueError(f"anchor not found in {path}")
-    start = text.index(anchor) + len(anchor)
+# pokedex.js is generated with regular indentation: top-level entries open
+# with "  key: {" and close with "  }", fields sit at four spaces. One-line
+# entries ("  key: {...},") are matched whole so they never swallow the next.
+_SHOWDOWN_ENTRY_RE = re.compile(r"\n  ([A-Za-z0-9]+): \{(?:([^\n]*)\},?(?=\r?\n)|(.*?)\n  \})", re.DOTALL)
+_SHOWDOWN_NUM_RE = re.compile(r"\n\s{4}num: (-?\d+),")
+_SHOWDOWN_SKIP_RE = re.compile(r'\n\s{4}(?:baseSpecies:|name: "CAP )')
+_SHOWDOWN_KEY_RE = re.compile(r"\s{2}([A-Za-z0-9]+): \{")
+
+
+def _scan_showdown_entries(text: str, start: int) -> List[Tuple[str, str]]:
+    # Brace-counting fallback for a pokedex.js that is not laid out as expected.
     i = start
     depth = 1
     entries: List[Tuple[str, str]] = []
+    match_key = _SHOWDOWN_KEY_RE.match
     while i < len(text) and depth > 0:
-        match = re.match(r"\s{2}([A-Za-z0-9]+): \{", text[i:])
+        # Match in place: slicing text[i:] here copied the rest of the file
+        # once per character.
+        match = match_key(text, i)
         if match and depth == 1:
             key = match.group(1)
-            i += match.end() - 1
+            i = match.end() - 1
             obj_start = i
             obj_depth = 1
             i += 1
@@ -183,23 +349,62 @@ def parse_showdown_species_ids(path: Path) -> List[str]:
         elif ch == "}":
             depth -= 1
         i += 1
+    return entries
+
+
+def parse_showdown_species_ids(path: Path) -> List[str]:
+    text = path.read_text(encoding="utf-8")
+    anchor = "const Pokedex = {"
+    if anchor not in text:
+        raise ValueError(f"anchor not found in {path}")
+    start = text.index(anchor) + len(anchor)
+    end = text.find("\n};", start)
+    if end < 0:
+        end = len(text)
+    entries = [
+        (m.group(1).lower(), m.group(3) if m.group(2) is None else m.group(2))
+        for m in _SHOWDOWN_ENTRY_RE.finditer(text, start, end)
+    ]
+    if not entries:
+        entries = _scan_showdown_entries(text, start)
 
     species: Set[str] = set()
     for key, body in entries:
-        num_match = re.search(r"\n\s{4}num: (-?\d+),", body)
+        num_match = _SHOWDOWN_NUM_RE.search(body)
         if not num_match:
             continue
         num = int(num_match.group(1))
         if num <= 0:
             continue
-        if re.search(r"\n\s{4}baseSpecies:", body):
-            continue
-        if re.search(r'\n\s{4}name: "CAP ', body):
+        if _SHOWDOWN_SKIP_RE.search(body):
             continue
         species.add(key)
     return sorted(species)
 
 
+def load_showdown_species_ids(path: Path, cache_path: Optional[Path] = None) -> List[str]:
+    """parse_showdown_species_ids, memoized on disk by the file's (mtime_ns, size)."""
+    if cache_path is None:
+        return parse_showdown_species_ids(path)
+    st = path.stat()
+    fingerprint = [st.st_mtime_ns, st.st_size]
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if cached.get("fingerprint") == fingerprint and isinstance(cached.get("species"), list):
+            return cached["species"]
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    species = parse_showdown_species_ids(path)
+    try:
+        tmp = cache_path.with_name(cache_path.name + ".tmp")
+        tmp.write_text(json.dumps({"fingerprint": fingerprint, "species": species}), encoding="utf-8")
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+    return species
+
+
 def format_species_list(items: Sequence[str]) -> str:
     return "`" + ", ".join(items) + "`"
 
@@ -217,14 +422,16 @@ def per_hour(count: int, hours: float) -> float:
 
 
 def load_usercache(path: Path) -> Dict[str, str]:
-    rows = json.loads(path.read_text(encoding="utf-8"))
+    rows = _json_loads(path.read_bytes())
     out: Dict[str, str] = {}
     for row in rows:
-        if not isinstance(row, Mapping):
+        # Rows are almost always well-formed; let the rare bad one raise.
+        try:
+            uuid = row["uuid"]
+            name = row["name"]
+        except (KeyError, TypeError):
             continue
-        uuid = row.get("uuid")
-        name = row.get("name")
-        if isinstance(uuid, str) and isinstance(name, str):
+        if type(uuid) is str and type(name) is str:
             out[uuid] = name
     return out
 
@@ -234,7 +441,7 @@ def load_player_report(data_dir: Path, player_uuid: str, player_name: str) -> Ma
     stats_path = data_dir / "world" / "stats" / f"{player_uuid}.json"
 
     pokedex = load_nbt(pokedex_path)
-    stats = json.loads(stats_path.read_text(encoding="utf-8"))
+    stats = _json_loads(stats_path.read_bytes())
 
     custom = (
         stats.get("stats", {}).get("minecraft:custom", {})
@@ -244,32 +451,44 @@ def load_player_report(data_dir: Path, player_uuid: str, player_name: str) -> Ma
     play_ticks = int(custom.get("minecraft:play_time", 0))
     play_hours = play_ticks / 20.0 / 3600.0
 
-    species_records = pokedex.get("speciesRecords", {})
-    if not isinstance(species_records, Mapping):
+    species_records = pokedex.get("speciesRecords")
+    if type(species_records) is not dict:
         species_records = {}
 
     seen: Set[str] = set()
     caught: Set[str] = set()
     encountered_only: Set[str] = set()
+    seen_add = seen.add
+    caught_add = caught.add
+    encountered_only_add = encountered_only.add
 
+    # load_nbt and json both produce plain dicts, so exact type checks are
+    # enough here and much cheaper than isinstance() against Mapping.
     for species_id, record in species_records.items():
-        if not isinstance(species_id, str) or not isinstance(record, Mapping):
+        if type(record) is not dict:
             continue
-        short_id = species_id.removeprefix("cobblemon:")
-        form_records = record.get("formRecords", {})
-        if not isinstance(form_records, Mapping):
+        form_records = record.get("formRecords")
+        if type(form_records) is not dict or not form_records:
             continue
-        knowledge = {
-            form_record.get("knowledge")
-            for form_record in form_records.values()
-            if isinstance(form_record, Mapping) and isinstance(form_record.get("knowledge"), str)
-        }
-        if knowledge:
-            seen.add(short_id)
-        if "CAUGHT" in knowledge:
-            caught.add(short_id)
-        elif "ENCOUNTERED" in knowledge:
-            encountered_only.add(short_id)
+        known = caught_form = encountered = False
+        for form_record in form_records.values():
+            if type(form_record) is not dict:
+                continue
+            knowledge = form_record.get("knowledge")
+            if knowledge == KNOWLEDGE_CAUGHT:
+                known = caught_form = True
+                break
+            if type(knowledge) is str:
+                known = True
+                if knowledge == KNOWLEDGE_ENCOUNTERED:
+                    encountered = True
+        if known:
+            short_id = species_id.removeprefix("cobblemon:")
+            seen_add(short_id)
+            if caught_form:
+                caught_add(short_id)
+            elif encountered:
+                encountered_only_add(short_id)
 
     return {
         "name": player_name,
@@ -283,18 +502,44 @@ def load_player_report(data_dir: Path, player_uuid: str, player_name: str) -> Ma
         "seen": sorted(seen),
         "caught": sorted(caught),
         "encountered_only": sorted(encountered_only),
+        "seen_count": len(seen),
+        "caught_count": len(caught),
+        "encountered_only_count": len(encountered_only),
     }
 
 
-def build_report(data_dir: Path) -> str:
+def load_player_reports(
+    data_dir: Path, roster: Sequence[Tuple[str, str]], workers: int = 1
+) -> List[Mapping[str, object]]:
+    """Load every ``(uuid, name)`` in ``roster``, in order.
+
+    Players are independent, so with ``workers > 1`` their NBT files are
+    inflated and parsed in a process pool. Tiny rosters stay in-process:
+    spawning workers costs more than it saves there.
+    """
+    uuids = [player_uuid for player_uuid, _ in roster]
+    names = [player_name for _, player_name in roster]
+    load = functools.partial(load_player_report, data_dir)
+    if workers <= 1 or len(roster) <= 2:
+        return list(map(load, uuids, names))
+    with ProcessPoolExecutor(max_workers=min(workers, len(roster))) as pool:
+        return list(pool.map(load, uuids, names))
+
+
+def render_report(data_dir: Path, out: TextIO, *, showdown_cache: bool = True, workers: int = 1) -> None:
+    """Write the Markdown report to ``out`` section by section.
+
+    Every input is loaded before the first write, so a missing or corrupt
+    player file raises without anything having been written to ``out``.
+    """
     usercache = load_usercache(data_dir / "usercache.json")
-    all_species = parse_showdown_species_ids(data_dir / "showdown" / "data" / "pokedex.js")
+    all_species = load_showdown_species_ids(
+        data_dir / "showdown" / "data" / "pokedex.js",
+        data_dir / "showdown" / ".pokedex-ids.cache.json" if showdown_cache else None,
+    )
     all_species_set = set(all_species)
 
-    players = [
-        load_player_report(data_dir, player_uuid, player_name)
-        for player_uuid, player_name in sorted(usercache.items(), key=lambda item: item[1].lower())
-    ]
+    players = load_player_reports(data_dir, sorted(usercache.items(), key=lambda item: item[1].lower()), workers)
 
     world_seen: Set[str] = set()
     world_caught: Set[str] = set()
@@ -302,142 +547,199 @@ def build_report(data_dir: Path) -> str:
         world_seen.update(player["seen"])
         world_caught.update(player["caught"])
 
-    today = dt.date.today().isoformat()
-    lines: List[str] = []
-    lines.append(f"# Rapport Pokedex serveur - {today}")
-    lines.append("")
-    lines.append("## Perimetre")
-    lines.append("")
-    lines.append("- Source joueurs: `data/world/pokedex/<uuid>.nbt`")
-    lines.append("- Source temps de jeu: `data/world/stats/<uuid>.json`")
-    lines.append("- Base complete des especes: `data/showdown/data/pokedex.js`")
-    lines.append("- Joueurs analyses: " + ", ".join(f"`{p['name']}`" for p in players))
-    lines.append("")
-    lines.append("Definitions:")
-    lines.append("- `seen` = espece marquee `ENCOUNTERED` ou `CAUGHT` dans le Pokedex serveur.")
-    lines.append("- `caught` = espece marquee `CAUGHT`.")
-    lines.append("- `encountered_only` = vue mais pas capturee.")
-    lines.append("- `play_time` = statistique vanilla `minecraft:play_time`, convertie en heures.")
-    lines.append("")
-    lines.append("## Vue d'ensemble")
-    lines.append("")
-    lines.append(f"- Especes implementees dans la stack: `{len(all_species)}`")
-    lines.append(f"- Especes deja vues sur le serveur (union des joueurs): `{len(world_seen)}` soit `{pct(len(world_seen), len(all_species))}%`")
-    lines.append(f"- Especes deja capturees sur le serveur (union des joueurs): `{len(world_caught)}` soit `{pct(len(world_caught), len(all_species))}%`")
-    lines.append("")
-    lines.append("| Joueur | Temps de jeu (h) | Vues | % du monde vu | % du roster total | Vues/h | Capturees | % du monde capture | % du roster total | Capt./h | Combats |")
-    lines.append("| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |")
+    # Totals and per-player ratios are used by both the summary table and the
+    # per-player sections: compute them once.
+    n_all = len(all_species)
+    n_world_seen = len(world_seen)
+    n_world_caught = len(world_caught)
+    ratios = []
     for player in players:
-        seen = len(player["seen"])
-        caught = len(player["caught"])
+        seen = player["seen_count"]
+        caught = player["caught_count"]
         hours = float(player["play_hours"])
-        lines.append(
+        ratios.append(
+            {
+                "seen": seen,
+                "caught": caught,
+                "hours": hours,
+                "seen_world": pct(seen, n_world_seen),
+                "seen_all": pct(seen, n_all),
+                "seen_h": per_hour(seen, hours),
+                "caught_world": pct(caught, n_world_caught),
+                "caught_all": pct(caught, n_all),
+                "caught_h": per_hour(caught, hours),
+            }
+        )
+
+    today = dt.date.today().isoformat()
+    write = out.write
+
+    def emit(text: str = "") -> None:
+        write(text)
+        write("\n")
+
+    emit(f"# Rapport Pokedex serveur - {today}")
+    emit()
+    emit("## Perimetre")
+    emit()
+    emit("- Source joueurs: `data/world/pokedex/<uuid>.nbt`")
+    emit("- Source temps de jeu: `data/world/stats/<uuid>.json`")
+    emit("- Base complete des especes: `data/showdown/data/pokedex.js`")
+    emit("- Joueurs analyses: " + ", ".join(f"`{p['name']}`" for p in players))
+    emit()
+    emit("Definitions:")
+    emit("- `seen` = espece marquee `ENCOUNTERED` ou `CAUGHT` dans le Pokedex serveur.")
+    emit("- `caught` = espece marquee `CAUGHT`.")
+    emit("- `encountered_only` = vue mais pas capturee.")
+    emit("- `play_time` = statistique vanilla `minecraft:play_time`, convertie en heures.")
+    emit()
+    emit("## Vue d'ensemble")
+    emit()
+    emit(f"- Especes implementees dans la stack: `{n_all}`")
+    emit(f"- Especes deja vues sur le serveur (union des joueurs): `{n_world_seen}` soit `{pct(n_world_seen, n_all)}%`")
+    emit(f"- Especes deja capturees sur le serveur (union des joueurs): `{n_world_caught}` soit `{pct(n_world_caught, n_all)}%`")
+    emit()
+    emit("| Joueur | Temps de jeu (h) | Vues | % du monde vu | % du roster total | Vues/h | Capturees | % du monde capture | % du roster total | Capt./h | Combats |")
+    emit("| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |")
+    for player, r in zip(players, ratios):
+        emit(
             "| {name} | {hours:.2f} | {seen} | {seen_world:.2f}% | {seen_all:.2f}% | {seen_h:.2f} | {caught} | {caught_world:.2f}% | {caught_all:.2f}% | {caught_h:.2f} | {battles} |".format(
                 name=player["name"],
-                hours=hours,
-                seen=seen,
-                seen_world=pct(seen, len(world_seen)),
-                seen_all=pct(seen, len(all_species)),
-                seen_h=per_hour(seen, hours),
-                caught=caught,
-                caught_world=pct(caught, len(world_caught)),
-                caught_all=pct(caught, len(all_species)),
-                caught_h=per_hour(caught, hours),
                 battles=player["battles_total"],
+                **r,
             )
         )
-    lines.append("")
-    lines.append("Lecture rapide:")
+    emit()
+    emit("Lecture rapide:")
     if players:
-        best_seen = max(players, key=lambda p: len(p["seen"]))
-        best_seen_h = max(players, key=lambda p: per_hour(len(p["seen"]), float(p["play_hours"])))
-        best_caught_h = max(players, key=lambda p: per_hour(len(p["caught"]), float(p["play_hours"])))
-        lines.append(f"- `{best_seen['name']}` a la meilleure couverture brute en especes vues.")
-        lines.append(f"- `{best_seen_h['name']}` a le meilleur rythme en especes vues par heure.")
-        lines.append(f"- `{best_caught_h['name']}` a le meilleur rythme en captures par heure.")
-    lines.append("")
-    lines.append("## Liste exhaustive du monde")
-    lines.append("")
-    lines.append("### World seen union")
-    lines.append("")
-    lines.append(format_species_list(sorted(world_seen)))
-    lines.append("")
-    lines.append("### World caught union")
-    lines.append("")
-    lines.append(format_species_list(sorted(world_caught)))
-    lines.append("")
-    lines.append("## Par joueur")
-    lines.append("")
-
-    for player in players:
-        seen = len(player["seen"])
-        caught = len(player["caught"])
-        hours = float(player["play_hours"])
-        lines.append(f"### {player['name']}")
-        lines.append("")
-        lines.append(f"- Temps de jeu: `{hours:.2f} h`")
-        lines.append(f"- Especes vues: `{seen}`")
-        lines.append(f"- Especes capturees: `{caught}`")
-        lines.append(f"- Especes vues seulement: `{len(player['encountered_only'])}`")
-        lines.append(f"- Couverture du monde vu: `{pct(seen, len(world_seen))}%`")
-        lines.append(f"- Couverture du monde capture: `{pct(caught, len(world_caught))}%`")
-        lines.append(f"- Couverture du roster complet: `{pct(seen, len(all_species))}%` vu, `{pct(caught, len(all_species))}%` capture")
-        lines.append(f"- Rythme: `{per_hour(seen, hours):.2f}` especes vues/h, `{per_hour(caught, hours):.2f}` especes capturees/h")
-        lines.append(f"- Combats: `{player['battles_total']}` total, `{player['battles_won']}` gagnes")
-        lines.append("")
-        lines.append("#### Seen")
-        lines.append("")
-        lines.append(format_species_list(player["seen"]))
-        lines.append("")
-        lines.append("#### Caught")
-        lines.append("")
-        lines.append(format_species_list(player["caught"]))
-        lines.append("")
-        lines.append("#### Encountered only")
-        lines.append("")
-        lines.append(format_species_list(player["encountered_only"]))
-        lines.append("")
-
-    lines.append("## Roster implemente mais jamais vu sur ce serveur")
-    lines.append("")
+        best_seen = max(players, key=lambda p: p["seen_count"])
+        best_seen_h = players[max(range(len(players)), key=lambda i: ratios[i]["seen_h"])]
+        best_caught_h = players[max(range(len(players)), key=lambda i: ratios[i]["caught_h"])]
+        emit(f"- `{best_seen['name']}` a la meilleure couverture brute en especes vues.")
+        emit(f"- `{best_seen_h['name']}` a le meilleur rythme en especes vues par heure.")
+        emit(f"- `{best_caught_h['name']}` a le meilleur rythme en captures par heure.")
+    emit()
+    emit("## Liste exhaustive du monde")
+    emit()
+    emit("### World seen union")
+    emit()
+    emit(format_species_list(sorted(world_seen)))
+    emit()
+    emit("### World caught union")
+    emit()
+    emit(format_species_list(sorted(world_caught)))
+    emit()
+    emit("## Par joueur")
+    emit()
+
+    for player, r in zip(players, ratios):
+        emit(f"### {player['name']}")
+        emit()
+        emit(f"- Temps de jeu: `{r['hours']:.2f} h`")
+        emit(f"- Especes vues: `{r['seen']}`")
+        emit(f"- Especes capturees: `{r['caught']}`")
+        emit(f"- Especes vues seulement: `{player['encountered_only_count']}`")
+        emit(f"- Couverture du monde vu: `{r['seen_world']}%`")
+        emit(f"- Couverture du monde capture: `{r['caught_world']}%`")
+        emit(f"- Couverture du roster complet: `{r['seen_all']}%` vu, `{r['caught_all']}%` capture")
+        emit(f"- Rythme: `{r['seen_h']:.2f}` especes vues/h, `{r['caught_h']:.2f}` especes capturees/h")
+        emit(f"- Combats: `{player['battles_total']}` total, `{player['battles_won']}` gagnes")
+        emit()
+        emit("#### Seen")
+        emit()
+        emit(format_species_list(player["seen"]))
+        emit()
+        emit("#### Caught")
+        emit()
+        emit(format_species_list(player["caught"]))
+        emit()
+        emit("#### Encountered only")
+        emit()
+        emit(format_species_list(player["encountered_only"]))
+        emit()
+
+    emit("## Roster implemente mais jamais vu sur ce serveur")
+    emit()
     unseen = sorted(all_species_set - world_seen)
-    lines.append(format_species_list(unseen))
-    lines.append("")
-    return "\n".join(lines)
+    emit(format_species_list(unseen))
 
 
-def write_report(content: str, output: Path) -> None:
-    output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_text(content, encoding="utf-8", newline="\n")
+def build_report(data_dir: Path, *, showdown_cache: bool = True, workers: int = 1) -> str:
+    out = io.StringIO()
+    render_report(data_dir, out, showdown_cache=showdown_cache, workers=workers)
+    return out.getvalue()
+
 
+class _Tee:
+    """Minimal writer fanning ``write`` calls out to several text streams."""
 
-def _multipart_body(fields: Mapping[str, str], files: Mapping[str, Tuple[str, bytes, str]]) -> Tuple[bytes, str]:
+    def __init__(self, *streams: TextIO) -> None:
+        self._streams = streams
+
+    def write(self, text: str) -> int:
+        for stream in self._streams:
+            stream.write(text)
+        return len(text)
+
+
+def write_report(
+    data_dir: Path,
+    output: Path,
+    *,
+    showdown_cache: bool = True,
+    workers: int = 1,
+    tee: Sequence[TextIO] = (),
+) -> None:
+    """Render the report into ``output``, copying every write to ``tee`` streams.
+
+    The report is rendered next to ``output`` and only moved into place once it
+    is complete, so a failed run leaves the previous report untouched.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="\n") as fh:
+            render_report(data_dir, _Tee(fh, *tee) if tee else fh, showdown_cache=showdown_cache, workers=workers)
+        os.replace(tmp, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _multipart_body(
+    fields: Mapping[str, str], files: Mapping[str, Tuple[str, bytes, str]]
+) -> Tuple[List[bytes], int, str]:
+    """Return the multipart parts, their total length and the boundary.
+
+    The parts are handed to urllib as-is (with an explicit Content-Length) so
+    the attachment is streamed from its own buffer instead of being copied
+    into one joined body.
+    """
     boundary = f"----codex-{uuid_lib.uuid4().hex}"
     chunks: List[bytes] = []
     for name, value in fields.items():
-        chunks.extend(
-            [
-                f"--{boundary}\r\n".encode(),
-                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode(),
-                value.encode("utf-8"),
-                b"\r\n",
-            ]
+        chunks.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            + value.encode("utf-8")
+            + b"\r\n"
         )
     for name, (filename, content, content_type) in files.items():
-        chunks.extend(
-            [
-                f"--{boundary}\r\n".encode(),
-                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'.encode(),
-                f"Content-Type: {content_type}\r\n\r\n".encode(),
-                content,
-                b"\r\n",
-            ]
+        chunks.append(
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
         )
+        chunks.append(content)
+        chunks.append(b"\r\n")
     chunks.append(f"--{boundary}--\r\n".encode())
-    return b"".join(chunks), boundary
+    return chunks, sum(map(len, chunks)), boundary
+
 
+def post_to_discord(webhook_url: str, report_path: Path, message: str, content: Optional[bytes] = None) -> None:
+    """Upload the report as an attachment.
 
-def post_to_discord(webhook_url: str, report_path: Path, message: str) -> None:
+    ``content`` is the report as written to ``report_path``; when given, it is
+    sent from memory instead of reading the file back.
+    """
     curl_bin = shutil.which("curl")
     if curl_bin:
         payload = json.dumps({"content": message})
@@ -449,30 +751,35 @@ def post_to_discord(webhook_url: str, report_path: Path, message: str) -> None:
             "-F",
             f"payload_json={payload}",
             "-F",
-            f"file1=@{report_path};type=text/markdown",
+            f"file1=@{report_path};type=text/markdown"
+            if content is None
+            else f"file1=@-;type=text/markdown;filename={report_path.name}",
             webhook_url,
         ]
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            subprocess.run(cmd, input=content, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
             return
         except subprocess.CalledProcessError as exc:
             stderr = exc.stderr.decode("utf-8", errors="replace").strip()
             raise RuntimeError(f"failed to post report to Discord via curl: {stderr or exc}") from exc
 
-    body, boundary = _multipart_body(
+    chunks, length, boundary = _multipart_body(
         fields={"payload_json": json.dumps({"content": message})},
         files={
             "file1": (
                 report_path.name,
-                report_path.read_bytes(),
+                report_path.read_bytes() if content is None else content,
                 "text/markdown",
             )
         },
     )
     req = urllib.request.Request(
         webhook_url,
-        data=body,
-        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        data=chunks,
+        headers={
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Content-Length": str(length),
+        },
         method="POST",
     )
     try:
@@ -502,6 +809,17 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         help="Markdown output path (default: ./audit/pokedex-comparison-YYYYMMDD.md)",
     )
     parser.add_argument("--stdout", action="store_true", help="Also print the report to stdout")
+    parser.add_argument(
+        "--no-showdown-cache",
+        action="store_true",
+        help="Always re-parse showdown/data/pokedex.js instead of using showdown/.pokedex-ids.cache.json",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(8, os.cpu_count() or 1),
+        help="Processes parsing player pokedex files in parallel (default: min(8, CPU count))",
+    )
     parser.add_argument("--discord", action="store_true", help="Post the generated report to Discord")
     parser.add_argument("--discord-webhook-url", default="", help="Discord webhook URL override")
     parser.add_argument(
@@ -522,18 +840,31 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     data_dir = Path(args.data_dir).resolve()
     output = Path(args.output).resolve()
 
-    report = build_report(data_dir)
-    write_report(report, output)
-
+    tee: List[TextIO] = []
+    if args.stdout:
+        tee.append(sys.stdout)
+    # Keep a copy for the Discord upload rather than reading the file back.
+    captured = io.StringIO() if args.discord else None
+    if captured is not None:
+        tee.append(captured)
+
+    write_report(
+        data_dir,
+        output,
+        showdown_cache=not args.no_showdown_cache,
+        workers=max(1, args.workers),
+        tee=tee,
+    )
     if args.stdout:
-        print(report)
+        # Keep the blank line print() used to add after the report.
+        print()
 
     if args.discord:
         webhook_url = resolve_webhook_url(args)
         if not webhook_url:
             print("Discord requested but no webhook URL could be resolved.", file=sys.stderr)
             return 2
-        post_to_discord(webhook_url, output, args.discord_message)
+        post_to_discord(webhook_url, output, args.discord_message, content=captured.getvalue().encode("utf-8"))
         print(f"OK report posted to Discord: {output}")
         return 0
 
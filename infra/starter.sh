@@ -6,7 +6,7 @@ set -euo pipefail
 # Usage:
 #   ./infra/starter.sh <Pseudo>
 #   ./infra/starter.sh --queue-if-offline <Pseudo>
-#   ./infra/starter.sh --drain-pending [<Pseudo>]
+#   ./infra/starter.sh --drain-pending [<Pseudo>...]
 #   ./infra/starter.sh --pending-list
 #
 # Notes:
@@ -24,7 +24,7 @@ usage() {
   echo "Usage:" >&2
   echo "  $0 <Pseudo>" >&2
   echo "  $0 --queue-if-offline <Pseudo>" >&2
-  echo "  $0 --drain-pending [<Pseudo>]" >&2
+  echo "  $0 --drain-pending [<Pseudo>...]" >&2
   echo "  $0 --pending-list" >&2
 }
 
@@ -170,14 +170,13 @@ case "$1" in
     ;;
 
   --drain-pending)
-    if [[ $# -gt 2 ]]; then
-      usage
-      exit 2
-    fi
-    if [[ $# -eq 2 ]]; then
-      drain_pending_for "$2"
-    else
+    shift
+    if [[ $# -eq 0 ]]; then
       drain_pending_all_online
+    else
+      for n in "$@"; do
+        drain_pending_for "${n}" || true
+      done
     fi
     ;;
 
@@ -0,0 +1,82 @@
+import importlib.util
+import struct
+import sys
+import unittest
+from pathlib import Path
+
+
+def load_module():
+    root = Path(__file__).resolve().parents[2]
+    path = root / "infra" / "detect-pokemart-near-spawn.py"
+    spec = importlib.util.spec_from_file_location("detect_pokemart_near_spawn", path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["detect_pokemart_near_spawn"] = mod
+    spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    return mod
+
+
+def _s(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    return struct.pack(">H", len(raw)) + raw
+
+
+def _tag(tag: int, name: str, payload: bytes) -> bytes:
+    return bytes([tag]) + _s(name) + payload
+
+
+def _compound(*items: bytes) -> bytes:
+    return b"".join(items) + b"\x00"
+
+
+def _list(inner: int, *payloads: bytes) -> bytes:
+    return bytes([inner]) + struct.pack(">i", len(payloads)) + b"".join(payloads)
+
+
+def _section(*names: str) -> bytes:
+    palette = _list(10, *[_compound(_tag(8, "Name", _s(name))) for name in names])
+    data = struct.pack(">i", 2) + struct.pack(">2q", 1, -1)
+    block_states = _compound(_tag(9, "palette", palette), _tag(12, "data", data))
+    return _compound(_tag(1, "Y", b"\x04"), _tag(10, "block_states", block_states))
+
+
+def _chunk(*sections: bytes) -> bytes:
+    root = _compound(
+        _tag(3, "DataVersion", struct.pack(">i", 3955)),
+        _tag(10, "Heightmaps", _compound(_tag(12, "WORLD_SURFACE", struct.pack(">i", 1) + bytes(8)))),
+        _tag(9, "sections", _list(10, *sections)),
+        _tag(8, "Status", _s("minecraft:full")),
+    )
+    return bytes([10]) + _s("") + root
+
+
+class TestDetectPokemartNearSpawn(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mod = load_module()
+
+    def test_load_palette_names_finds_markers_across_sections(self):
+        raw = _chunk(
+            _section("minecraft:stone", "cobblemon:blue_plaque"),
+            _section("minecraft:air"),
+            _section("cobblemon:saccharine_hanging_sign"),
+        )
+        markers = {"cobblemon:blue_plaque", "cobblemon:saccharine_hanging_sign", "cobblemon:saccharine_wall_hanging_sign"}
+        self.assertEqual(
+            self.mod._load_palette_names(raw, markers),
+            {"cobblemon:blue_plaque", "cobblemon:saccharine_hanging_sign"},
+        )
+
+    def test_load_palette_names_ignores_names_outside_palettes(self):
+        raw = bytes([10]) + _s("") + _compound(_tag(8, "Name", _s("cobblemon:blue_plaque")))
+        self.assertEqual(self.mod._load_palette_names(raw, {"cobblemon:blue_plaque"}), set())
+
+    def test_cluster_hit_chunks_groups_diagonal_neighbours(self):
+        hits = [(0, 0, {"a"}), (1, 1, {"b"}), (5, 5, {"c"})]
+        components = self.mod._cluster_hit_chunks(hits)
+        self.assertEqual(len(components), 2)
+        self.assertEqual(sorted(components[0][0]), [(0, 0), (1, 1)])
+        self.assertEqual(components[0][1], {"a", "b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import importlib.util
+import struct
 import sys
+import tempfile
 import unittest
+import zlib
 from pathlib import Path
 
 
@@ -41,10 +44,107 @@ class FakeTerrainWorld:
         return (cx, cz) not in self.missing_chunks
 
 
+def _s(text):
+    raw = text.encode("utf-8")
+    return struct.pack(">H", len(raw)) + raw
+
+
+def _tag(tag, name, payload):
+    return bytes([tag]) + _s(name) + payload
+
+
+def _compound(*items):
+    return b"".join(items) + b"\x00"
+
+
+def _list(inner, *payloads):
+    return bytes([inner]) + struct.pack(">i", len(payloads)) + b"".join(payloads)
+
+
+def _long_array(values):
+    return struct.pack(">i", len(values)) + b"".join(struct.pack(">Q", v) for v in values)
+
+
+def _pack(values, bits, per_long):
+    # per_long=None packs a continuous bit stream (heightmap reader handles spill).
+    if per_long is None:
+        total = sum(v << (i * bits) for i, v in enumerate(values))
+        n = (len(values) * bits + 63) // 64 + 1
+        return [(total >> (64 * k)) & (2**64 - 1) for k in range(n)]
+    return [
+        sum(v << (j * bits) for j, v in enumerate(values[k : k + per_long]))
+        for k in range(0, len(values), per_long)
+    ]
+
+
+def _terrain_chunk(cx, cz, heights, blocks, min_y=-64):
+    """Chunk NBT with grass at each column's height, stone below and ``blocks`` overrides."""
+    hm = [heights.get(((cx << 4) + (i & 15), (cz << 4) + (i >> 4)), 70) - min_y + 1 for i in range(256)]
+    sections = []
+    for sy in range(4, 7):
+        palette = ["minecraft:air", "minecraft:stone", "minecraft:grass_block"]
+        idx = []
+        for i in range(4096):
+            ly, lz, lx = i >> 8, (i >> 4) & 15, i & 15
+            x, y, z = (cx << 4) + lx, (sy << 4) + ly, (cz << 4) + lz
+            surface = heights.get((x, z), 70)
+            name = blocks.get((x, y, z)) or (
+                "minecraft:grass_block" if y == surface else "minecraft:stone" if y < surface else "minecraft:air"
+            )
+            if name not in palette:
+                palette.append(name)
+            idx.append(palette.index(name))
+        block_states = _compound(
+            _tag(9, "palette", _list(10, *[_compound(_tag(8, "Name", _s(n))) for n in palette])),
+            _tag(12, "data", _long_array(_pack(idx, 4, 16))),
+        )
+        sections.append(_compound(_tag(1, "Y", bytes([sy])), _tag(10, "block_states", block_states)))
+    root = _compound(
+        _tag(3, "xPos", struct.pack(">i", cx)),
+        _tag(3, "zPos", struct.pack(">i", cz)),
+        _tag(10, "Heightmaps", _compound(_tag(12, "MOTION_BLOCKING_NO_LEAVES", _long_array(_pack(hm, 9, None))))),
+        _tag(9, "sections", _list(10, *sections)),
+    )
+    return bytes([10]) + _s("") + root
+
+
+def write_region(world_dir, chunks):
+    """Write ``{(cx, cz): nbt}`` (all in region 0,0) as ``region/r.0.0.mca``."""
+    locations = [0] * 1024
+    body = b""
+    sector = 2
+    for (cx, cz), raw in chunks.items():
+        payload = zlib.compress(raw)
+        blob = struct.pack(">I", len(payload) + 1) + b"\x02" + payload
+        blob += bytes(-len(blob) % 4096)
+        locations[cx + cz * 32] = (sector << 8) | (len(blob) // 4096)
+        body += blob
+        sector += len(blob) // 4096
+    (world_dir / "region").mkdir(parents=True, exist_ok=True)
+    (world_dir / "region" / "r.0.0.mca").write_bytes(struct.pack(">1024I", *locations) + bytes(4096) + body)
+
+
+class PointQueryWorld:
+    """Hides WorldReader's rectangle/column helpers so evaluate_site takes the per-block path."""
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    def height_at(self, x, z, *, heightmap_type="MOTION_BLOCKING_NO_LEAVES"):
+        return self.reader.height_at(x, z, heightmap_type=heightmap_type)
+
+    def block_name(self, x, y, z):
+        return self.reader.block_name(x, y, z)
+
+    def region_exists_for_chunk(self, cx, cz):
+        return self.reader.region_exists_for_chunk(cx, cz)
+
+
 class TestHostileMobTowerSite(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.mod = load_module("find_hostile_mob_tower_site", "infra/find-hostile-mob-tower-site.py")
+        cls.world_tools = sys.modules["world_tools"]
 
     def test_candidate_origins_sorted_by_preferred_radius(self):
         pts = self.mod.candidate_origins(0, 0, min_distance=64, max_distance=96, step=32, preferred_radius=64)
@@ -73,6 +173,47 @@ class TestHostileMobTowerSite(unittest.TestCase):
         w.missing_chunks.add((0, 0))
         self.assertIsNone(self.mod.evaluate_site(w, 0, 0, floors=3))
 
+    def _reader_world(self, heights, blocks):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        world_dir = Path(tmp.name)
+        write_region(world_dir, {(cx, cz): _terrain_chunk(cx, cz, heights, blocks) for cx in range(4) for cz in range(4)})
+        return self.world_tools.WorldReader(world_dir)
+
+    def test_world_reader_rect_and_column_helpers_match_point_queries(self):
+        heights = {(30, 31): 71, (47, 50): 69}
+        blocks = {(33, 72, 40): "minecraft:oak_leaves", (40, 100, 40): "minecraft:oak_log"}
+        reader = self._reader_world(heights, blocks)
+        rows = reader.heights_rect(14, 20, 49, 35)
+        self.assertEqual(rows, [[reader.height_at(x, z) for z in range(20, 36)] for x in range(14, 50)])
+        self.assertEqual(rows[30 - 14][31 - 20], 71)
+        for x, z in ((33, 40), (40, 40), (47, 50), (0, 63)):
+            self.assertEqual(reader.column_names(x, z, 60, 110), [reader.block_name(x, y, z) for y in range(60, 111)])
+        self.assertEqual(reader.column_names(40, 40, 100, 100), ["minecraft:oak_log"])
+        with self.assertRaises(FileNotFoundError):
+            reader.heights_rect(60, 60, 70, 70)
+
+    def test_evaluate_site_fast_paths_match_point_queries_on_world_reader(self):
+        blocks = {(33, 72, 40): "minecraft:oak_leaves", (40, 100, 40): "minecraft:oak_log", (44, 75, 35): "minecraft:stone"}
+        for heights in ({(30, 31): 71}, {(30, 31): 72}, {}):
+            reader = self._reader_world(heights, blocks)
+            fast = self.mod.evaluate_site(reader, 40, 40, floors=3)
+            slow = self.mod.evaluate_site(PointQueryWorld(self.world_tools.WorldReader(reader.world_dir)), 40, 40, floors=3)
+            self.assertEqual(fast, slow)
+        self.assertIsNotNone(fast)
+        self.assertEqual(fast["metrics"]["obstruction_weight"], 2.25)
+
+    def test_select_site_with_workers_matches_serial_order(self):
+        w = FakeTerrainWorld()
+        # Water under the first preferred candidates forces a few rejections.
+        for x, z in self.mod.candidate_origins(0, 0, min_distance=64, max_distance=96, step=32, preferred_radius=64)[:3]:
+            w.set_block(x, 70, z, "minecraft:water")
+        kwargs = dict(min_distance=64, max_distance=96, step=32, floors=3, preferred_radius=64)
+        serial = self.mod.select_site(w, (0, 70, 0), **kwargs)
+        parallel = self.mod.select_site(w, (0, 70, 0), workers=4, **kwargs)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial["attempts"], 4)
+
 
 if __name__ == "__main__":
     unittest.main()
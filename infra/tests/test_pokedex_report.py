@@ -0,0 +1,202 @@
+import gzip
+import importlib.util
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+
+def load_module():
+    root = Path(__file__).resolve().parents[2]
+    path = root / "infra" / "pokedex-report.py"
+    spec = importlib.util.spec_from_file_location("pokedex_report", path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["pokedex_report"] = mod
+    spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    return mod
+
+
+def _s(text: str) -> bytes:
+    raw = text.encode("utf-8")
+    return struct.pack(">H", len(raw)) + raw
+
+
+def _tag(tag: int, name: str, payload: bytes) -> bytes:
+    return bytes([tag]) + _s(name) + payload
+
+
+def _compound(*items: bytes) -> bytes:
+    return b"".join(items) + b"\x00"
+
+
+def _list(inner: int, *payloads: bytes) -> bytes:
+    return bytes([inner]) + struct.pack(">i", len(payloads)) + b"".join(payloads)
+
+
+def _pokedex() -> bytes:
+    form = lambda knowledge: _compound(_tag(8, "knowledge", _s(knowledge)))
+    root = _compound(
+        _tag(1, "b", struct.pack(">b", -2)),
+        _tag(2, "s", struct.pack(">h", -300)),
+        _tag(3, "i", struct.pack(">i", 70000)),
+        _tag(4, "l", struct.pack(">q", -(2**40))),
+        _tag(5, "f", struct.pack(">f", 1.5)),
+        _tag(6, "d", struct.pack(">d", -0.25)),
+        _tag(7, "ba", struct.pack(">i", 3) + bytes([1, 2, 255])),
+        _tag(11, "ia", struct.pack(">i", 3) + struct.pack(">3i", 1, -2, 2**31 - 1)),
+        _tag(12, "la", struct.pack(">i", 2) + struct.pack(">2q", -1, 2**62)),
+        _tag(8, "name", _s("Pokédex")),
+        _tag(9, "empty", _list(0)),
+        _tag(9, "empty_compounds", _list(10)),
+        _tag(9, "nested", _list(9, _list(3, struct.pack(">i", 1), struct.pack(">i", 2)), _list(8, _s("a")), _list(1))),
+        _tag(9, "strings", _list(8, _s("x"), _s("x"), _s(""))),
+        _tag(
+            10,
+            "speciesRecords",
+            _compound(
+                _tag(10, "cobblemon:bulbasaur", _compound(_tag(10, "formRecords", _compound(_tag(10, "normal", form("CAUGHT")))))),
+                _tag(
+                    10,
+                    "cobblemon:pidgey",
+                    _compound(
+                        _tag(10, "formRecords", _compound(_tag(10, "normal", form("ENCOUNTERED")), _tag(10, "alola", _compound()))),
+                        _tag(9, "forms", _list(10, _compound(_tag(3, "n", struct.pack(">i", 7))), _compound())),
+                    ),
+                ),
+            ),
+        ),
+    )
+    return bytes([10]) + _s("") + root
+
+
+EXPECTED = {
+    "b": -2,
+    "s": -300,
+    "i": 70000,
+    "l": -(2**40),
+    "f": 1.5,
+    "d": -0.25,
+    "ba": [1, 2, 255],
+    "ia": [1, -2, 2**31 - 1],
+    "la": [-1, 2**62],
+    "name": "Pokédex",
+    "empty": [],
+    "empty_compounds": [],
+    "nested": [[1, 2], ["a"], []],
+    "strings": ["x", "x", ""],
+    "speciesRecords": {
+        "cobblemon:bulbasaur": {"formRecords": {"normal": {"knowledge": "CAUGHT"}}},
+        "cobblemon:pidgey": {
+            "formRecords": {"normal": {"knowledge": "ENCOUNTERED"}, "alola": {}},
+            "forms": [{"n": 7}, {}],
+        },
+    },
+}
+
+
+class TestPokedexReportNbt(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.mod = load_module()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def _write(self, name: str, data: bytes) -> Path:
+        path = self.tmp / name
+        path.write_bytes(data)
+        return path
+
+    def _assert_tree(self, actual, expected):
+        # Arrays may come back as list or array.array; compare as lists.
+        if isinstance(expected, dict):
+            self.assertIsInstance(actual, dict)
+            self.assertEqual(list(actual), list(expected))
+            for key in expected:
+                self._assert_tree(actual[key], expected[key])
+        elif isinstance(expected, list):
+            self.assertEqual(len(actual), len(expected))
+            for a, e in zip(actual, expected):
+                self._assert_tree(a, e)
+        else:
+            self.assertEqual(actual, expected)
+
+    def test_load_nbt_reads_raw_and_gzip_files(self):
+        raw = _pokedex()
+        self._assert_tree(self.mod.load_nbt(self._write("raw.nbt", raw)), EXPECTED)
+        self._assert_tree(self.mod.load_nbt(self._write("gz.nbt", gzip.compress(raw))), EXPECTED)
+
+    def test_load_nbt_truncated_input_raises_nbt_error(self):
+        raw = _pokedex()
+        for cut in range(len(raw)):
+            with self.subTest(cut=cut):
+                with self.assertRaises(self.mod.NBTError):
+                    self.mod.load_nbt(self._write("cut.nbt", raw[:cut]))
+
+    def test_load_nbt_truncated_or_corrupt_gzip_raises_nbt_error(self):
+        packed = gzip.compress(_pokedex())
+        for cut in (2, 10, len(packed) // 2, len(packed) - 8, len(packed) - 1):
+            with self.subTest(cut=cut):
+                with self.assertRaises(self.mod.NBTError):
+                    self.mod.load_nbt(self._write("cut.nbt", packed[:cut]))
+        corrupt = bytearray(packed)
+        corrupt[20] ^= 0xFF
+        corrupt[30] ^= 0x55
+        with self.assertRaises(self.mod.NBTError):
+            self.mod.load_nbt(self._write("corrupt.nbt", bytes(corrupt)))
+        with self.assertRaises(self.mod.NBTError):
+            self.mod.load_nbt(self._write("crc.nbt", packed[:-8] + bytes(8)))
+
+    def test_load_nbt_rejects_non_compound_root(self):
+        with self.assertRaises(self.mod.NBTError):
+            self.mod.load_nbt(self._write("list.nbt", bytes([9]) + _s("") + _list(0)))
+
+    def test_load_player_report_classifies_species(self):
+        data_dir = self.tmp / "data"
+        uuid = "ab12cd34-0000-0000-0000-000000000000"
+        (data_dir / "world" / "pokedex" / "ab").mkdir(parents=True)
+        (data_dir / "world" / "stats").mkdir(parents=True)
+        (data_dir / "world" / "pokedex" / "ab" / f"{uuid}.nbt").write_bytes(gzip.compress(_pokedex()))
+        (data_dir / "world" / "stats" / f"{uuid}.json").write_text(
+            '{"stats": {"minecraft:custom": {"minecraft:play_time": 144000}}}', encoding="utf-8"
+        )
+        report = self.mod.load_player_report(data_dir, uuid, "Ash")
+        self.assertEqual(report["seen"], ["bulbasaur", "pidgey"])
+        self.assertEqual(report["caught"], ["bulbasaur"])
+        self.assertEqual(report["encountered_only"], ["pidgey"])
+        self.assertEqual(report["play_hours"], 2.0)
+
+    def test_parse_showdown_species_ids_keeps_entries_apart(self):
+        path = self.tmp / "pokedex.js"
+        path.write_text(
+            "export const Pokedex = {\n"
+            "  foo: {\n"
+            "  },\n"
+            "  bulbasaur: {\n"
+            "    num: 1,\n"
+            '    name: "Bulbasaur",\n'
+            "    baseStats: {\n"
+            "      hp: 45,\n"
+            "      atk: 49,\n"
+            "    },\n"
+            "  },\n"
+            "  oneline: {num: 9999},\n"
+            "  ivysaur: {\n"
+            "    num: 2,\n"
+            '    name: "Ivysaur",\n'
+            "  },\n"
+            "  venusaurmega: {\n"
+            "    num: 3,\n"
+            '    baseSpecies: "Venusaur",\n'
+            "  },\n"
+            "};\n",
+            encoding="utf-8",
+        )
+        self.assertEqual(self.mod.parse_showdown_species_ids(path), ["bulbasaur", "ivysaur"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -11,6 +12,7 @@ from hostile_mob_tower_spec import critical_air_positions, critical_block_expect
 from world_tools import WorldReader, is_air
 
 
+@lru_cache(maxsize=None)
 def _base_block(name: str) -> str:
     return name.split("[", 1)[0]
 
@@ -5,10 +5,11 @@ from __future__ import annotations
 
 import gzip
 import struct
+import sys
 import zlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 
 SECTOR_BYTES = 4096
@@ -261,6 +262,10 @@ def _light_arr_ok(arr: Optional[bytes]) -> bool:
     return arr is not None and len(arr) >= LIGHT_NIBBLE_BYTES
 
 
+_LOW_NIBBLE = bytes(i & 15 for i in range(256))
+_HIGH_NIBBLE = bytes(i >> 4 for i in range(256))
+
+
 @dataclass
 class Section:
     y: int
@@ -268,6 +273,7 @@ class Section:
     data: Optional[List[int]]
     block_light: Optional[bytes]
     sky_light: Optional[bytes]
+    _indices: Optional[Sequence[int]] = field(default=None, repr=False, compare=False)
 
     @property
     def bits(self) -> int:
@@ -276,28 +282,63 @@ class Section:
             return 0
         return max(4, (n - 1).bit_length())
 
-    def palette_index(self, idx: int) -> int:
-        if self.data is None:
-            return 0
+    def _uniform(self) -> bool:
         bits = self.bits
-        if bits <= 0:
-            return 0
-        values_per_long = 64 // bits
-        if values_per_long <= 0:
-            return 0
-        li = idx // values_per_long
-        if li < 0 or li >= len(self.data):
-            return 0
-        off = (idx % values_per_long) * bits
+        return self.data is None or bits <= 0 or 64 // bits <= 0
+
+    def indices(self) -> Sequence[int]:
+        """Palette index of all 4096 blocks (``(ly << 8) | (lz << 4) | lx``), unpacked on first use."""
+        if self._indices is None:
+            self._indices = self._unpack_indices()
+        return self._indices
+
+    def _unpack_indices(self) -> Sequence[int]:
+        if self._uniform():
+            return bytes(4096)
+        bits = self.bits
+        data = self.data or []
+        if bits in (4, 8) and len(data) * 64 // bits >= 4096:
+            # Byte-aligned packings split in C: one byte per index, or two nibbles
+            # (low first) per byte.
+            raw = struct.pack(f"<{len(data)}Q", *data)
+            if bits == 8:
+                return raw[:4096]
+            nibbles = bytearray(2 * len(raw))
+            nibbles[0::2] = raw.translate(_LOW_NIBBLE)
+            nibbles[1::2] = raw.translate(_HIGH_NIBBLE)
+            return bytes(nibbles[:4096])
         mask = (1 << bits) - 1
-        return (self.data[li] >> off) & mask
+        shifts = range(0, (64 // bits) * bits, bits)
+        out: List[int] = []
+        for word in data:
+            out.extend([(word >> shift) & mask for shift in shifts])
+            if len(out) >= 4096:
+                break
+        # Short data arrays read as index 0, like out-of-range longs did.
+        out.extend([0] * (4096 - len(out)))
+        del out[4096:]
+        return out
+
+    def palette_index(self, idx: int) -> int:
+        return self.indices()[idx]
 
     def block_name(self, lx: int, ly: int, lz: int) -> str:
-        idx = (ly << 8) | (lz << 4) | lx
-        pi = self.palette_index(idx)
-        if pi < 0 or pi >= len(self.palette):
-            return "minecraft:air"
-        return self.palette[pi]
+        indices = self._indices
+        if indices is None:
+            indices = self.indices()
+        pi = indices[(ly << 8) | (lz << 4) | lx]
+        palette = self.palette
+        return palette[pi] if pi < len(palette) else "minecraft:air"
+
+    def column_names(self, lx: int, lz: int, ly1: int, ly2: int) -> List[str]:
+        """Block names for ``ly1..ly2`` of one column, read as a stride of the unpacked indices."""
+        palette = self.palette
+        n_palette = len(palette)
+        base = (lz << 4) | lx
+        return [
+            palette[pi] if pi < n_palette else "minecraft:air"
+            for pi in self.indices()[base + (ly1 << 8) : base + (ly2 << 8) + 1 : 256]
+        ]
 
     def light_value(self, lx: int, ly: int, lz: int, *, require_sky: bool) -> Optional[int]:
         idx = (ly << 8) | (lz << 4) | lx
@@ -317,6 +358,7 @@ class Chunk:
     is_light_on: bool
     sections: Dict[int, Section]
     heightmaps: Dict[str, List[int]]
+    _decoded_heights: Dict[Tuple[str, int], List[int]] = field(default_factory=dict, repr=False, compare=False)
 
     def block_name(self, x: int, y: int, z: int) -> str:
         sy = y >> 4
@@ -330,6 +372,22 @@ class Chunk:
             return "minecraft:air"
         return sec.block_name(lx, ly, lz)
 
+    def column_names(self, x: int, z: int, y1: int, y2: int) -> List[str]:
+        lx = x - (self.cx << 4)
+        lz = z - (self.cz << 4)
+        if not (0 <= lx <= 15 and 0 <= lz <= 15):
+            return ["minecraft:air"] * (y2 - y1 + 1)
+        out: List[str] = []
+        for sy in range(y1 >> 4, (y2 >> 4) + 1):
+            lo = max(y1, sy << 4)
+            hi = min(y2, (sy << 4) + 15)
+            sec = self.sections.get(sy)
+            if sec is None:
+                out.extend(["minecraft:air"] * (hi - lo + 1))
+            else:
+                out.extend(sec.column_names(lx, lz, lo & 15, hi & 15))
+        return out
+
     def light_info(self, x: int, y: int, z: int, *, require_sky: bool) -> Tuple[Optional[int], bool]:
         if not self.is_light_on:
             return None, False
@@ -357,6 +415,18 @@ class Chunk:
             raise NBTError("local height coords out of bounds")
         return min_y + _heightmap_get(hm, lx, lz, bits=9) - 1
 
+    def heights(self, *, heightmap_type: str, min_y: int) -> List[int]:
+        """All 256 column heights of the heightmap, indexed ``lz * 16 + lx``; decoded once per chunk."""
+        key = (heightmap_type, min_y)
+        decoded = self._decoded_heights.get(key)
+        if decoded is None:
+            hm = self.heightmaps.get(heightmap_type)
+            if not hm:
+                raise NBTError(f"heightmap missing: {heightmap_type}")
+            decoded = [min_y + _heightmap_get(hm, i & 15, i >> 4, bits=9) - 1 for i in range(256)]
+            self._decoded_heights[key] = decoded
+        return decoded
+
 
 class RegionFile:
     def __init__(self, path: Path):
@@ -464,7 +534,8 @@ def _parse_chunk(raw: bytes) -> Chunk:
                                             name_val = buf.read_string()
                                         else:
                                             _skip_tag_payload(pt, buf)
-                                    palette.append(name_val or "minecraft:air")
+                                    # Interned: the same few names repeat across every section.
+                                    palette.append(sys.intern(name_val) if name_val else "minecraft:air")
                             else:
                                 for _ in range(max(0, p_ln)):
                                     _skip_tag_payload(p_inner, buf)
@@ -516,10 +587,18 @@ class WorldReader:
             raise ValueError(f"unknown dimension: {dimension}")
         self._require_sky_light = dimension != "nether"
         self._region_cache: Dict[Tuple[int, int], Optional[RegionFile]] = {}
+        self._region_present: Dict[Tuple[int, int], bool] = {}
         self._chunk_cache: Dict[Tuple[int, int], Optional[Chunk]] = {}
 
     def region_exists_for_chunk(self, cx: int, cz: int) -> bool:
-        return (self.region_dir / f"r.{cx // 32}.{cz // 32}.mca").exists()
+        # Site searches ask this for every chunk of every candidate; one stat per
+        # region file is enough.
+        key = (cx // 32, cz // 32)
+        present = self._region_present.get(key)
+        if present is None:
+            present = (self.region_dir / f"r.{key[0]}.{key[1]}.mca").exists()
+            self._region_present[key] = present
+        return present
 
     def _get_region(self, rx: int, rz: int) -> Optional[RegionFile]:
         key = (rx, rz)
@@ -555,6 +634,13 @@ class WorldReader:
             return "minecraft:air"
         return chunk.block_name(x, y, z)
 
+    def column_names(self, x: int, z: int, y1: int, y2: int) -> List[str]:
+        """Block names from ``y1`` to ``y2`` inclusive at one column, resolving its chunk once."""
+        chunk = self.get_chunk(x // 16, z // 16)
+        if chunk is None:
+            return ["minecraft:air"] * (y2 - y1 + 1)
+        return chunk.column_names(x, z, y1, y2)
+
     def light_info(self, x: int, y: int, z: int) -> Tuple[Optional[int], bool]:
         chunk = self.get_chunk(x // 16, z // 16)
         if chunk is None:
@@ -567,6 +653,25 @@ class WorldReader:
             raise FileNotFoundError(f"missing chunk for x={x} z={z}")
         return chunk.height_at(x, z, heightmap_type=heightmap_type, min_y=self.min_y)
 
+    def heights_rect(
+        self, x1: int, z1: int, x2: int, z2: int, *, heightmap_type: str = "MOTION_BLOCKING_NO_LEAVES"
+    ) -> List[List[int]]:
+        """Heights for the inclusive box as rows ``[x - x1][z - z1]``, filled chunk by chunk."""
+        rows = [[0] * (z2 - z1 + 1) for _ in range(x2 - x1 + 1)]
+        for cx in range(x1 >> 4, (x2 >> 4) + 1):
+            for cz in range(z1 >> 4, (z2 >> 4) + 1):
+                chunk = self.get_chunk(cx, cz)
+                if chunk is None:
+                    raise FileNotFoundError(f"missing chunk cx={cx} cz={cz}")
+                column = chunk.heights(heightmap_type=heightmap_type, min_y=self.min_y)
+                zs = range(max(z1, cz << 4), min(z2, (cz << 4) + 15) + 1)
+                for x in range(max(x1, cx << 4), min(x2, (cx << 4) + 15) + 1):
+                    row = rows[x - x1]
+                    lx = x & 15
+                    for z in zs:
+                        row[z - z1] = column[((z & 15) << 4) | lx]
+        return rows
+
 
 def chunk_box_from_block_box(x1: int, z1: int, x2: int, z2: int) -> Tuple[int, int, int, int]:
     return x1 >> 4, z1 >> 4, x2 >> 4, z2 >> 4